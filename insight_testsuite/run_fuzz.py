@@ -0,0 +1,751 @@
+# -*- coding: utf-8 -*-
+"""
+Pharmacopedia.Py v1.0
+Pharmacy Counting Project
+Arhur D. Dysart
+
+
+DESCRIPTION
+
+Analyzes and organizes medical pharmacy data. Using data from the Centers for
+Medicare & Medicaid Services, this script calculates: (1) total number of
+prescribers and (2) total prescriber expenditure for all listed drugs. Exports
+analyzed data to text file with drugs organized by decreasing cost and, where
+required, alphanumeric order. Created on 13:34:50 Wednesday, July 11, 2018.
+
+This module is a differential fuzz harness. It generates adversarial data
+files in CMS format (e.g., double-quotation marks around single elements,
+non-delimiting commas, unpaired double-quotation marks, mixed line breaks,
+files without header, reordered columns, and column names of other CMS
+layouts) and checks that every engine in the "all_engines" dictionary exports the
+same report as the reference engine, which keeps the original line-by-line
+parsing of Pharmacopedia.Py v1.0. When reports differ, the failing input is
+shrunk to the smallest input which still fails and is shown in terminal.
+
+Execute from the home directory:
+
+    python3 ./insight_testsuite/run_fuzz.py [number of runs] [seed]
+
+Script metadata available at end of module.
+
+
+MIT LICENSE
+
+Copyright (c) 2018 Arthur D. Dysart
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+## REQUIRED MODULES
+
+# Calculates exactly rounded reference drug cost totals
+import math
+# Creates temporary input, output, and checkpoint files
+import os
+# Copies import state recorded at checkpoints
+import pickle
+# Generates random data entries
+import random
+# Retrives arguments from terminal and sets module path
+import sys
+# Creates temporary working directory
+import tempfile
+# Silences parsing warnings during fuzzing
+import warnings as wn
+# Splits drug names between complementary drug filters
+import zlib
+
+
+## REQUIRED LIBRARIES
+
+# Sets source directory as module path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# Retrives functions for data import
+# Source: (home)/src/DysartImport.py
+import DysartImport as ad1
+# Retrives functions for data analysis
+# Source: (home)/src/DysartAnalysis.py
+import DysartAnalysis as ad2
+# Retrives functions for data export
+# Source: (home)/src/DysartExport.py
+import DysartExport as ad3
+# Retrives script settings
+# Source: (home)/src/Pharmacopedia.py
+import Pharmacopedia as ph
+
+
+## MODULE SETTINGS
+
+# Sets default number of fuzz runs and random seed
+num_runs = 200
+seed = 2018
+# Sets maximum number of data entries per generated file
+max_entries = 25
+# Sets building blocks for prescriber and drug names. Includes apostrophes,
+# commas, non-alphanumerics, mixed cases, and non-ASCII characters
+name_parts = [
+    "Smith", "O'Brien", "Doe", "M.D.", "Garcia-Lopez", "de la Cruz", "Jr.",
+    "Mc'Coy", "Ñuñez", "A", "b", " ", "(RX)", "#2", "5,000", "AMBIEN",
+    "Ambien", "ambien ", "CHLORPROMAZINE", "PANCRELIPASE 5,000", "ZeTiA",
+    "BENZTROPINE MESYLATE", "HCL", "10%", "1/2", "&", "\\",
+]
+# Sets drug costs, including decimals and equal costs
+drug_costs = ["0", "1", "100", "100.00", "1000", "999.5", "0.01", "1500.49",
+    "2000", "12.345", "7"]
+# Sets line breaks used between data entries, including carriage returns
+# only, for which whole file is read as single line
+line_breaks = ["\n", "\n", "\n", "\r\n", "\r"]
+# Sets fraction of generated files with CMS header; other files have no
+# header, so that first data entry is imported from first line read
+header_rate = 0.7
+# Sets column layouts of generated files with header, including reordered
+# columns, column names of other CMS layouts, and additional columns
+header_layouts = [
+    ["id", "prescriber_last_name", "prescriber_first_name", "drug_name",
+        "drug_cost"],
+    ["drug_name", "prescriber_first_name", "prescriber_last_name",
+        "drug_cost", "id"],
+    ["id", "drug_cost", "prescriber_last_name", "prescriber_first_name",
+        "drug_name"],
+    ["npi", "nppes_provider_last_org_name", "nppes_provider_first_name",
+        "drug_name", "total_drug_cost"],
+    ["prscrbr_npi", "prscrbr_last_org_name", "prscrbr_first_name",
+        "brnd_name", "gnrc_name", "tot_clms", "tot_drug_cst"],
+]
+# Sets standard column names for column names of other CMS layouts, as
+# given in CMS documentation, so that reference engine does not depend on
+# the column aliases of DysartImport.Py
+reference_aliases = {
+    "npi": "id",
+    "prscrbr_npi": "id",
+    "nppes_provider_last_org_name": "prescriber_last_name",
+    "prscrbr_last_org_name": "prescriber_last_name",
+    "nppes_provider_first_name": "prescriber_first_name",
+    "prscrbr_first_name": "prescriber_first_name",
+    "brnd_name": "drug_name",
+    "total_drug_cost": "drug_cost",
+    "tot_drug_cst": "drug_cost",
+}
+
+
+## PRIMARY FUNCTIONS
+
+def reference_engine(import_path, export_path, alpha_sort, cost_usd,
+        rng=None):
+    """
+    Imports, analyzes, sorts, and exports data using the original parsing of
+    Pharmacopedia.Py v1.0: file is read line by line in text mode and each
+    line is fully parsed with the reference_parse_line() function. Header
+    rows are identified by drug name column, and column names of other CMS
+    layouts are mapped by the "reference_aliases" dictionary. Columns before
+    drug name are identified by position from start of entry, drug name and
+    following columns by position from end of entry. Files without header
+    have the default CMS layout. Total cost is the exactly rounded sum of all
+    drug costs, which is the sum approximated by v1.0.
+
+    Args:
+        import_path (string): path to input file.
+        export_path (string): path to output file.
+        alpha_sort (boolean): if True, sorting ignores special characters.
+        cost_usd (boolean): if True, costs are exported in dollars only.
+        rng (random.Random or None): not used.
+
+    Returns:
+        None.
+    """
+    # Sets empty dictionary for import data
+    all_data = {}
+    # Sets empty column layout, which is set from first data entry
+    positions = None
+    # Safely opens and closes file for reading
+    with open(import_path, 'r', encoding="utf-8") as target_file:
+        # Iterates over all data entries or lines
+        for line in target_file:
+            # If True, data entry is empty line
+            if line.count(',') < 1:
+                # Skips import of empty lines
+                continue
+            # Parses line with original parser
+            parsed_line = reference_parse_line(line)
+            # Sets standard column names of elements, if line is header
+            names = [
+                reference_aliases.get(name, name) for name in
+                (x.strip().strip("\"").lower() for x in parsed_line)
+            ]
+            # If True, data entry is file header
+            if "drug_name" in names:
+                # If True, sets column layout from first header
+                if positions is None:
+                    positions = reference_positions(names)
+                # Skips import of file header
+                continue
+            # If True, file has no header and has default column layout
+            if positions is None:
+                positions = reference_positions([
+                    "id", "prescriber_last_name", "prescriber_first_name",
+                    "drug_name", "drug_cost",
+                ])
+            # Sets prescriber names, drug name, and drug cost by position
+            last_name, first_name, drug_name, drug_cost = (
+                parsed_line[positions[column]] for column in [
+                    "prescriber_last_name", "prescriber_first_name",
+                    "drug_name", "drug_cost",
+                ]
+            )
+            # Adds cost to drug's prescriber
+            all_data.setdefault(drug_name, {}).setdefault(
+                (last_name, first_name), []).append(float(drug_cost))
+    # Calculates prescriber count and exact total cost for each drug
+    processed_data = {
+        drug: (len(prescribers), math.fsum(
+            cost for costs in prescribers.values() for cost in costs))
+        for drug, prescribers in all_data.items()
+    }
+    # Sorts and exports data with shared sorting and export functions
+    all_drugs_sorted = ad2.sort_drugs(processed_data, alpha_sort, ch=ph.safe_char)
+    ad3.export_data(processed_data, all_drugs_sorted, export_path, cost_usd)
+    # Completes reference run
+    return None
+
+def reference_positions(names):
+    """
+    Returns position of each column: columns before drug name from start of
+    entry, drug name and following columns from end of entry.
+    """
+    # Sets index of drug name column
+    pivot = names.index("drug_name")
+    # Returns position of each column
+    return {
+        name: (i if i < pivot else i - len(names))
+        for i, name in enumerate(names)
+    }
+
+def reference_parse_line(line):
+    """
+    Splits data entry exactly as the parse_line_custom() function of
+    Pharmacopedia.Py v1.0, so that faster parsers are checked against
+    original behavior for elements with single double-quotation marks,
+    non-delimiting commas, and unpaired double-quotation marks.
+
+    Args:
+        line (string): single string of raw data from entry import.
+
+    Returns:
+        parsed_line (list of strings): contains parsed line entry.
+    """
+    # Removes end line break and splits line by comma delimiter
+    comma_split = line.replace("\n", "").split(",")
+    # If no double-quotation mark characters, returns comma split
+    if line.count("\"") == 0:
+        # Returns comma split
+        return comma_split
+    # Collects indices of elements with single double-quotation mark
+    quote_indices = [
+        i for i in range(len(comma_split)) if comma_split[i].count("\"") == 1
+    ]
+    # Pairs opening and closing indices
+    quote_pairs = [
+        (quote_indices[2 * j], quote_indices[2 * j + 1] + 1)
+        for j in range(len(quote_indices) // 2)
+    ]
+    # Iterates over quote pairs in reverse order to perform reconstruction
+    for p in reversed(quote_pairs):
+        # Merges enclosed elements into single element
+        comma_split[p[0]:p[1]] = [",".join(comma_split[p[0]:p[1]])]
+    # Returns reconstructed split
+    return comma_split
+
+def pipeline_engine(import_path, export_path, alpha_sort, cost_usd, rng=None,
+        stats=False, **kwargs):
+    """
+    Imports, analyzes, sorts, and exports data with the current script
+    functions. Keyword arguments are passed to import_data() function. If
+    data is spilled to run files, run files are merged with merge_runs().
+
+    Args:
+        import_path (string): path to input file.
+        export_path (string): path to output file.
+        alpha_sort (boolean): if True, sorting ignores special characters.
+        cost_usd (boolean): if True, costs are exported in dollars only.
+        rng (random.Random or None): not used.
+        stats (boolean): if True, statistics columns are exported.
+
+    Returns:
+        None.
+    """
+    # Sets empty collection of run files
+    spill_runs = []
+    # Imports data
+    all_data = ad1.import_data(
+        import_path, ch=ph.safe_char, spill_runs=spill_runs, **kwargs
+    )
+    # Sets empty statistics, if requested
+    drug_stats = {} if stats else None
+    # Analyzes data from run files or memory
+    if spill_runs:
+        processed_data = ad2.merge_runs(spill_runs, drug_stats)
+    else:
+        processed_data = ad2.analyze_data(all_data, drug_stats)
+    # Sorts and exports data
+    all_drugs_sorted = ad2.sort_drugs(processed_data, alpha_sort, ch=ph.safe_char)
+    ad3.export_data(
+        processed_data, all_drugs_sorted, export_path, cost_usd, drug_stats
+    )
+    # Completes pipeline run
+    return None
+
+def small_blocks_engine(import_path, export_path, alpha_sort, cost_usd,
+        rng=None):
+    """
+    Runs pipeline with 7-byte read blocks, so that nearly every line crosses
+    block boundaries.
+    """
+    # Sets small block size for this run only
+    default_size, ad1.block_size = ad1.block_size, 7
+    try:
+        # Runs pipeline
+        pipeline_engine(import_path, export_path, alpha_sort, cost_usd)
+    finally:
+        # Restores default block size
+        ad1.block_size = default_size
+    # Completes run
+    return None
+
+def spill_engine(import_path, export_path, alpha_sort, cost_usd, rng=None):
+    """
+    Runs pipeline with 1-byte memory budget, so that import data is spilled
+    to a run file after every entry and merged with merge_runs(). Run files
+    are merged 3 at a time, so that intermediate merge passes are used.
+    """
+    # Sets small merge fan-in for this run only
+    default_fanin, ad2.merge_fanin = ad2.merge_fanin, 3
+    try:
+        # Runs pipeline with minimal memory budget
+        pipeline_engine(
+            import_path, export_path, alpha_sort, cost_usd,
+            budget=1, spill_dir=os.path.dirname(export_path),
+        )
+    finally:
+        # Restores default merge fan-in
+        ad2.merge_fanin = default_fanin
+    # Completes run
+    return None
+
+def resume_engine(import_path, export_path, alpha_sort, cost_usd, rng=None):
+    """
+    Runs pipeline with checkpoint after every 7-byte block, then reruns
+    import from a randomly chosen checkpoint as after a crash. Checkpoint is
+    chosen with the given random number generator, which is seeded for each
+    run, so that failures are reproduced during shrinking.
+    """
+    # Sets collection of recorded checkpoints
+    recorded = []
+    # Sets checkpoint function and block size for this run only
+    save_checkpoint = ad1.adk.save_checkpoint
+    default_size, ad1.block_size = ad1.block_size, 7
+    ad1.adk.save_checkpoint = lambda d, k, state: recorded.append(
+        pickle.dumps(state))
+    try:
+        # Runs import with checkpoint after every block
+        pipeline_engine(
+            import_path, export_path, alpha_sort, cost_usd,
+            state_dir=os.path.dirname(export_path), interval=1e-9,
+        )
+    finally:
+        # Restores checkpoint function and block size
+        ad1.adk.save_checkpoint = save_checkpoint
+        ad1.block_size = default_size
+    # Removes export of uninterrupted run
+    os.remove(export_path)
+    # Sets randomly chosen checkpoint, or no checkpoint
+    resume_state = pickle.loads(rng.choice(recorded)) if recorded else None
+    # Runs pipeline resumed from checkpoint
+    pipeline_engine(
+        import_path, export_path, alpha_sort, cost_usd,
+        resume_state=resume_state,
+    )
+    # Completes run
+    return None
+
+def stats_engine(import_path, export_path, alpha_sort, cost_usd, rng=None):
+    """
+    Runs pipeline with statistics in memory and with 1-byte memory budget,
+    using cost sketches of size 1 so that quantiles are estimated, and
+    raises error if exported statistics differ. Report without statistics
+    is then exported for comparison with reference engine.
+    """
+    # Sets empty collection of reports with statistics
+    all_reports = []
+    # Sets small sketch size for this run only
+    default_size, ad2.sketch_size = ad2.sketch_size, 1
+    try:
+        # Iterates over in-memory and spilled analysis
+        for budget in [None, 1]:
+            # Runs pipeline with statistics
+            pipeline_engine(
+                import_path, export_path, alpha_sort, cost_usd, stats=True,
+                budget=budget, spill_dir=os.path.dirname(export_path),
+            )
+            # Safely opens and closes output file for reading
+            with open(export_path, 'r', encoding="utf-8") as output_file:
+                # Saves report with statistics
+                all_reports.append(output_file.read())
+            # Removes report with statistics
+            os.remove(export_path)
+    finally:
+        # Restores default sketch size
+        ad2.sketch_size = default_size
+    # If True, statistics depend on analysis path
+    if all_reports[0] != all_reports[1]:
+        # Raises error for different statistics
+        raise AssertionError("Statistics differ between memory and spill.")
+    # Runs pipeline without statistics
+    pipeline_engine(import_path, export_path, alpha_sort, cost_usd)
+    # Completes run
+    return None
+
+def filter_engine(import_path, export_path, alpha_sort, cost_usd, rng=None):
+    """
+    Imports data twice with complementary drug filters, which split drug
+    names by checksum, and joins both imports before analysis. Unquoted
+    entries are filtered by drug name from set_decoder() before the full
+    parse, so that report differs if cheap and full parse disagree. Raises
+    error if imported drug does not belong to half of its filter.
+    """
+    # Sets empty import data of both filters
+    all_data = {}
+    # Sets half of drug name from checksum
+    get_half = lambda name: zlib.crc32(name.encode()) % 2
+    # Iterates over both halves of drug names
+    for half in [0, 1]:
+        # Imports drugs of half with drug filter
+        half_data = ad1.import_data(
+            import_path, ch=ph.safe_char,
+            drug_filter=lambda name: get_half(name) == half,
+        )
+        # If True, drug was filtered by other name than full parse
+        if any(get_half(name) != half for name in half_data):
+            # Raises error for inconsistent drug filter
+            raise AssertionError("Drug passed filter of other half.")
+        # Joins import data of half
+        all_data.update(half_data)
+    # Analyzes, sorts, and exports joined data
+    processed_data = ad2.analyze_data(all_data)
+    all_drugs_sorted = ad2.sort_drugs(processed_data, alpha_sort, ch=ph.safe_char)
+    ad3.export_data(processed_data, all_drugs_sorted, export_path, cost_usd)
+    # Completes run
+    return None
+
+def generate_entries(rng, layout):
+    """
+    Generates adversarial data entries in CMS format.
+
+    Args:
+        rng (random.Random): random number generator.
+        layout (list of strings): column names in file order. Additional
+            columns have random names or numbers.
+
+    Returns:
+        all_entries (list of strings): data entries without line breaks.
+    """
+    # Sets empty collection of data entries
+    all_entries = []
+    # Iterates over random number of data entries
+    for i in range(rng.randint(1, max_entries)):
+        # Sets prescriber last name, first name, and drug name
+        names = [
+            "".join(rng.choice(name_parts) for _ in range(rng.randint(1, 3)))
+            for _ in range(3)
+        ]
+        # Iterates over names
+        for j, name in enumerate(names):
+            # If True, name contains commas and is enclosed as in CMS data
+            if "," in name or rng.random() < 0.2:
+                # Encloses name in double-quotation marks
+                names[j] = "\"{}\"".format(name)
+            # If True, inserts single unpaired double-quotation mark
+            if rng.random() < 0.03:
+                # Inserts unpaired double-quotation mark
+                k = rng.randint(0, len(names[j]))
+                names[j] = names[j][:k] + "\"" + names[j][k:]
+        # Sets values of required columns
+        values = {
+            "id": str(1000000000 + i),
+            "prescriber_last_name": names[0],
+            "prescriber_first_name": names[1],
+            "drug_name": names[2],
+            "drug_cost": rng.choice(drug_costs),
+        }
+        # Sets data entry in column order; additional columns have random
+        # names or numbers
+        entry = ",".join(
+            values.get(reference_aliases.get(column, column)) or
+            rng.choice(name_parts + drug_costs).replace(",", "")
+            for column in layout
+        )
+        # Saves data entry; repeats some entries
+        all_entries.extend([entry] * (2 if rng.random() < 0.1 else 1))
+        # If True, adds empty line
+        if rng.random() < 0.05:
+            # Saves empty line
+            all_entries.append("")
+    # Returns data entries
+    return all_entries
+
+def write_input(work_dir, all_entries, breaks):
+    """
+    Writes data file with given line breaks.
+
+    Args:
+        work_dir (string): path to working directory.
+        all_entries (list of strings): lines without line breaks, starting
+            with CMS header if file has header.
+        breaks (list of strings): line break after each line; last line has
+            no line break if shorter than lines.
+
+    Returns:
+        import_path (string): path to input file.
+    """
+    # Sets path to input file
+    import_path = os.path.join(work_dir, "itcont.txt")
+    # Safely opens and closes file for writing, without line translation
+    with open(import_path, 'w', encoding="utf-8", newline="") as input_file:
+        # Writes lines with line breaks
+        input_file.write(write_input_text(all_entries, breaks))
+    # Returns path to input file
+    return import_path
+
+def run_engine(engine, work_dir, all_entries, breaks, settings, run_seed):
+    """
+    Runs engine on data entries and returns exported report, or name of
+    raised error.
+
+    Args:
+        engine (function): engine to run.
+        work_dir (string): path to working directory.
+        all_entries (list of strings): data entries without line breaks.
+        breaks (list of strings): line breaks after data entries.
+        settings (tuple of booleans): sorting method and cost display.
+        run_seed (integer): seed of random number generator passed to
+            engine, so that repeated runs of same input are identical.
+
+    Returns:
+        report (string): exported report, or "error" with error type if
+            engine failed, so that different failures do not match.
+    """
+    # Writes input file
+    import_path = write_input(work_dir, all_entries, breaks)
+    # Sets path to output file
+    export_path = os.path.join(work_dir, "top_cost_drug.txt")
+    # Silences parsing warnings
+    with wn.catch_warnings():
+        wn.simplefilter("ignore")
+        try:
+            # Runs engine
+            engine(
+                import_path, export_path, *settings,
+                rng=random.Random(run_seed),
+            )
+            # Safely opens and closes output file for reading
+            with open(export_path, 'r', encoding="utf-8") as output_file:
+                # Sets exported report
+                report = output_file.read()
+        except Exception as error:
+            # Sets report of failed run with error type
+            report = "error: {}".format(type(error).__name__)
+    # Removes output and run files
+    for name in os.listdir(work_dir):
+        os.remove(os.path.join(work_dir, name))
+    # Returns exported report
+    return report
+
+def fails(engine, work_dir, all_entries, breaks, settings, run_seed):
+    """
+    Returns True if engine report differs from reference report.
+    """
+    # Compares engine and reference reports
+    return run_engine(
+        engine, work_dir, all_entries, breaks, settings, run_seed
+    ) != run_engine(
+        reference_engine, work_dir, all_entries, breaks, settings, run_seed
+    )
+
+def shrink(engine, work_dir, all_entries, breaks, settings, run_seed):
+    """
+    Reduces failing input to smallest input which still fails. First removes
+    data entries, then removes single characters of remaining entries, while
+    reports still differ.
+
+    Args:
+        engine (function): failing engine.
+        work_dir (string): path to working directory.
+        all_entries (list of strings): failing data entries.
+        breaks (list of strings): line breaks after data entries.
+        settings (tuple of booleans): sorting method and cost display.
+        run_seed (integer): seed of random number generator passed to
+            engine.
+
+    Returns:
+        all_entries (list of strings): smallest failing data entries.
+        breaks (list of strings): line breaks of smallest failing input.
+    """
+    # Sets line break for each line
+    breaks = list(breaks)
+    # Iterates over lines in reverse order, removing lines if still failing
+    for i in reversed(range(len(all_entries))):
+        # Sets input without line
+        entries = all_entries[:i] + all_entries[i + 1:]
+        lines = breaks[:i] + breaks[i + 1:]
+        # If True, input without entry still fails
+        if fails(engine, work_dir, entries, lines, settings, run_seed):
+            # Keeps smaller input
+            all_entries, breaks = entries, lines
+    # Iterates over remaining entries
+    for i in range(len(all_entries)):
+        # Sets character position
+        k = 0
+        # Iterates over characters, removing characters if still failing
+        while k < len(all_entries[i]):
+            # Sets input without character
+            entries = list(all_entries)
+            entries[i] = entries[i][:k] + entries[i][k + 1:]
+            # If True, input without character still fails
+            if fails(engine, work_dir, entries, breaks, settings, run_seed):
+                # Keeps smaller input
+                all_entries = entries
+            else:
+                # Moves to next character
+                k += 1
+    # Returns smallest failing input
+    return all_entries, breaks
+
+def run_fuzz(runs, fuzz_seed):
+    """
+    Generates random inputs and compares each engine with reference engine.
+    Prints smallest failing input and both reports for first failure.
+
+    Args:
+        runs (integer): number of generated inputs.
+        fuzz_seed (integer): random seed.
+
+    Returns:
+        passed (boolean): if True, all engines matched reference engine.
+    """
+    # Sets random number generator
+    rng = random.Random(fuzz_seed)
+    # Creates temporary working directory
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Iterates over all runs
+        for run in range(runs):
+            # If True, generates file with header and random column layout
+            if rng.random() < header_rate:
+                # Generates data entries after header
+                layout = rng.choice(header_layouts)
+                all_entries = [",".join(layout)] + generate_entries(rng, layout)
+            # Else, generates file without header in default column layout
+            else:
+                # Generates data entries
+                all_entries = generate_entries(rng, header_layouts[0])
+            breaks = [rng.choice(line_breaks) for _ in range(len(all_entries))]
+            # If True, last entry has no line break
+            if rng.random() < 0.5:
+                breaks.pop()
+            settings = (rng.random() < 0.5, rng.random() < 0.5)
+            # Sets seed of random choices of engines
+            run_seed = rng.randrange(2 ** 32)
+            # Iterates over all engines
+            for name, engine in all_engines.items():
+                # If True, engine report matches reference report
+                if not fails(
+                        engine, work_dir, all_entries, breaks, settings, run_seed):
+                    continue
+                # Shrinks failing input
+                entries, lines = shrink(
+                    engine, work_dir, all_entries, breaks, settings, run_seed
+                )
+                # Prints failing engine, settings, and smallest input
+                print("[FAIL]: engine \"{}\" (run {}, seed {}, run seed {}), "
+                    "alpha_sort={}, cost_usd={}".format(
+                        name, run, fuzz_seed, run_seed, *settings))
+                print("Smallest failing input:")
+                print(repr(write_input_text(entries, lines)))
+                print("Engine report:")
+                print(repr(run_engine(
+                    engine, work_dir, entries, lines, settings, run_seed)))
+                print("Reference report:")
+                print(repr(run_engine(
+                    reference_engine, work_dir, entries, lines, settings,
+                    run_seed)))
+                # Reports failure
+                return False
+    # Prints number of passed runs
+    print("[PASS]: {} runs, {} engines, seed {}".format(
+        runs, len(all_engines), fuzz_seed))
+    # Reports success
+    return True
+
+def write_input_text(all_entries, breaks):
+    """
+    Returns text of input file written by write_input() function.
+    """
+    # Returns all lines with line breaks
+    return "".join(
+        line + (breaks[i] if i < len(breaks) else "")
+        for i, line in enumerate(all_entries)
+    )
+
+
+## ENGINE REGISTRY
+
+# Sets engines compared with reference engine. Faster parsers or
+# aggregators are added here with the signature of reference_engine()
+all_engines = {
+    "pipeline": pipeline_engine,
+    "small_blocks": small_blocks_engine,
+    "spill": spill_engine,
+    "resume": resume_engine,
+    "stats": stats_engine,
+    "filter": filter_engine,
+}
+
+
+## MAIN MODULE
+
+if __name__ == "__main__":
+    # Retrives number of runs and seed from terminal
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else num_runs
+    fuzz_seed = int(sys.argv[2]) if len(sys.argv) > 2 else seed
+    # Runs fuzz harness and sets exit status
+    sys.exit(0 if run_fuzz(runs, fuzz_seed) else 1)
+
+
+## MODULE METADATA
+
+__author__ = 'Arthur D. Dysart'
+__copyright__ = 'Copyright 2018, Pharmacopedia.Py'
+__credits__ = ['Arthur D. Dysart']
+__license__ = 'MIT License'
+__version__ = '1.0.0'
+__maintainer__ = 'Arthur D. Dysart'
+__email__ = 'hi@arthurdys.art'
+__status__ = 'closed'
+
+
+## END OF MODULE
@@ -85,8 +85,14 @@ function run_all_tests {
 
     setup_testing_input_output
 
+    # Optional flags of test are listed in options file
+    TEST_OPTIONS=""
+    if [ -f ${GRADER_ROOT}/tests/${test_folder}/options ]; then
+      TEST_OPTIONS=$(cat ${GRADER_ROOT}/tests/${test_folder}/options)
+    fi
+
     cd ${GRADER_ROOT}/temp
-    bash run.sh 2>&1
+    bash run.sh ${TEST_OPTIONS} 2>&1
     cd ../
 
     compare_outputs
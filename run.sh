@@ -1,7 +1,8 @@
 #!/bin/bash
 
-# Runs Pharmacopedia.Py script with default input
-python3 ./src/Pharmacopedia.py ./input/itcont.txt ./output/top_cost_drug.txt False
+# Runs Pharmacopedia.Py script with default input; optional flags given to
+# this script are passed on
+python3 ./src/Pharmacopedia.py ./input/itcont.txt ./output/top_cost_drug.txt False "$@"
 
 # Leaves terminal window open to display script responses. Remove comment tag to ENABLE this feature
 # read -n 1 -s -r -p $'\n(Press any key to exit)\n'
\ No newline at end of file
@@ -43,17 +43,49 @@ SOFTWARE.
 """
 
 
+## REQUIRED MODULES
+
+# Opens bounded group of run files, which are closed together
+import contextlib
+# Merges sorted run files
+import heapq
+# Appends end marker to merged run records
+import itertools
+# Reads run records from disk
+import json
+# Calculates exactly rounded sum of drug costs
+import math
+# Removes run files after merge
+import os
+# Creates intermediate run files
+import tempfile
+
+
+## MODULE SETTINGS
+
+# Sets size parameter of cost sketches. Quantiles are exact for drugs with
+# fewer prescribers; larger values improve accuracy and use more memory
+sketch_size = 200
+# Sets confidence level of intervals reported in sampling preview
+confidence_level = 0.95
+# Sets maximum number of run files opened at once during merge; larger
+# numbers of run files are merged in passes through intermediate run files
+merge_fanin = 64
+
+
 ## PRIMARY FUNCTIONS
 
-def analyze_data(all_data):
+def analyze_data(all_data, drug_stats=None):
     """
     Calculates total cost and number of prescribers for each drug. All unique
     drugs (set of strings) determined using set comprehension. For each drug,
     number of prescribers (integer) determined by list comprehension wrapped
     with sum() function. For each prescriber, gross drug cost (list of floats)
-    determined by list comprehension. Net drug cost, accounting for net
-    prescriber costs for given drug, determined using prescriber drug costs
-    wrapped by sum() function. Processed data saved in dictionary.
+    determined by list comprehension. Net drug cost, accounting for all
+    prescriber costs for given drug, determined using exactly rounded
+    math.fsum() function. Processed data saved in dictionary. If statistics
+    dictionary is specified, net cost of each prescriber is added to cost
+    sketch of drug in the same pass.
 
     Args:
         all_data (nested dictionary): contains all collected, parsed, and
@@ -61,6 +93,9 @@ def analyze_data(all_data):
             value is sub-dictionary of prescribers (tuple of strings).
             Secondary key is prescriber name (string) and secondary value is
             drug cost (list of floats).
+        drug_stats (dictionary or None): collects cost sketch (CostSketch)
+            of prescriber net costs with drug name (string) as key. If None,
+            statistics are not calculated.
 
     Returns:
         processed_data (dictionary): contains all analyzed data. Primary key
@@ -78,17 +113,236 @@ def analyze_data(all_data):
         all_prescribers = {prescriber for prescriber in all_data[drug].keys()}
         # Calculates total number of prescribers
         num_prescribers = sum([ 1 for prescriber in all_prescribers ])
-        # Calculates prescriber net drug cost
-        prescriber_costs = [
-            sum(all_data[drug][prescriber]) for prescriber in all_prescribers
-        ]
-        # Calculate gross prescriber cost for given drug
-        total_cost = sum(prescriber_costs)
+        # Calculate gross prescriber cost for given drug. Exactly rounded
+        # sum does not depend on order of prescribers or drug costs
+        total_cost = math.fsum(
+            cost for prescriber in all_prescribers
+            for cost in all_data[drug][prescriber]
+        )
         # Sets tuple of number of prescribers (index 0) and total cost (1)
         processed_data[drug] = (num_prescribers, total_cost)
+        # If True, adds prescriber net costs to cost sketch of drug
+        if drug_stats is not None:
+            # Creates cost sketch for drug
+            drug_stats[drug] = CostSketch()
+            # Iterates over all prescribers in sorted order, which is order
+            # of merge_runs(), so that estimated quantiles do not depend on
+            # whether data is spilled
+            for prescriber in sorted(all_data[drug]):
+                # Adds exactly rounded prescriber net cost
+                drug_stats[drug].update(math.fsum(all_data[drug][prescriber]))
     # Returns dictionary of analyzed data
     return processed_data
 
+def merge_runs(spill_runs, drug_stats=None):
+    """
+    Calculates total cost and number of prescribers for each drug from sorted
+    run files written during import. Run files are merged in k-way passes of
+    at most "merge_fanin" run files, so that only one record per open run
+    file is held in memory and file limits are not reached; earlier passes
+    write intermediate run files using the combine_runs() function. Records
+    are ordered by drug name then prescriber name, so that prescribers are
+    counted as changes of prescriber name. Total cost is accumulated as exact
+    partial sums, so that results match the analyze_data() function. If
+    statistics dictionary is specified, net cost of each prescriber is added
+    to cost sketch of drug during merge. Run files are removed after merge,
+    also if merge fails.
+
+    Args:
+        spill_runs (list of strings): contains paths to run files.
+        drug_stats (dictionary or None): collects cost sketch (CostSketch)
+            of prescriber net costs with drug name (string) as key. If None,
+            statistics are not calculated.
+
+    Returns:
+        processed_data (dictionary): contains all analyzed data. Primary key
+            is drug name (string), and primary value is tuple containing
+            number of prescribers (integer, index 0) and total cost (float,
+            index 1).
+    """
+    # Sets initial dictionary for analysis data
+    processed_data = {}
+    # Sets run files not yet merged
+    all_runs = list(spill_runs)
+    # If True, merge fails and remaining run files are removed
+    try:
+        # Iterates over merge passes until run files fit in single pass
+        while len(all_runs) > merge_fanin:
+            # Merges oldest run files into intermediate run file, which is
+            # merged after remaining run files
+            merged_runs = all_runs[:merge_fanin]
+            all_runs = all_runs[merge_fanin:] + [combine_runs(merged_runs)]
+            # Removes merged run files
+            for path in merged_runs:
+                # Removes single run file
+                os.remove(path)
+        # Safely opens and closes run files of final pass for reading
+        with contextlib.ExitStack() as run_stack:
+            # Sets merged stream of run records ordered by drug and prescriber
+            all_records = merge_records(run_stack, all_runs)
+            # Calculates prescriber count and cost for each drug
+            count_records(all_records, processed_data, drug_stats)
+    finally:
+        # Removes all remaining run files
+        for path in all_runs:
+            # Removes single run file
+            os.remove(path)
+    # Returns dictionary of analyzed data
+    return processed_data
+
+def count_records(all_records, processed_data, drug_stats=None):
+    """
+    Calculates total cost and number of prescribers for each drug from
+    merged run records. Used by merge_runs().
+
+    Args:
+        all_records (iterator of lists): run records ordered by drug name
+            then prescriber name.
+        processed_data (dictionary): collects analyzed data with drug name as
+            key.
+        drug_stats (dictionary or None): collects cost sketch of prescriber
+            net costs with drug name as key. If None, statistics are not
+            calculated.
+
+    Returns:
+        None.
+    """
+    # Sets current drug, prescriber, and accumulators
+    current_drug, current_prescriber = None, None
+    num_prescribers, partials, prescriber_partials = 0, [], []
+    # Iterates over all run records, followed by end marker
+    for record in itertools.chain(all_records, [[None, None, None, []]]):
+        # Sets drug, prescriber last name, first name, and drug costs
+        drug, last_name, first_name, costs = record
+        # If True, all records of previous prescriber are collected
+        if (drug, last_name, first_name) != \
+                (current_drug,) + (current_prescriber or (None, None)):
+            # If True, adds previous prescriber net cost to cost sketch
+            if drug_stats is not None and current_prescriber is not None:
+                # Adds exactly rounded prescriber net cost
+                drug_stats[current_drug].update(math.fsum(prescriber_partials))
+            # Resets prescriber accumulator
+            current_prescriber, prescriber_partials = None, []
+        # If True, all records of previous drug are collected
+        if drug != current_drug:
+            # If True, saves previous drug
+            if current_drug is not None:
+                # Sets number of prescribers and total cost
+                processed_data[current_drug] = (
+                    num_prescribers, math.fsum(partials)
+                )
+            # If True, end marker is reached
+            if drug is None:
+                # Ends merge
+                break
+            # Resets accumulators for new drug
+            current_drug, num_prescribers, partials = drug, 0, []
+            # If True, creates cost sketch for new drug
+            if drug_stats is not None:
+                # Creates cost sketch
+                drug_stats[drug] = CostSketch()
+        # If True, record belongs to new prescriber
+        if current_prescriber is None:
+            # Counts new prescriber
+            current_prescriber = (last_name, first_name)
+            num_prescribers += 1
+        # Adds drug costs to exact partial sums of drug and prescriber
+        for cost in costs:
+            # Adds single drug cost
+            add_partials(partials, cost)
+            add_partials(prescriber_partials, cost)
+    # Completes count
+    return None
+
+def merge_records(run_stack, all_runs):
+    """
+    Opens run files and returns merged stream of run records ordered by drug
+    name then prescriber name. Used by merge_runs() and combine_runs().
+
+    Args:
+        run_stack (contextlib.ExitStack): closes run files when exited, also
+            if opening of later run file fails.
+        all_runs (list of strings): contains paths to run files.
+
+    Returns:
+        (iterator of lists): merged run records.
+    """
+    # Opens all run files for reading
+    run_files = [
+        run_stack.enter_context(open(path, 'r', encoding="utf-8"))
+        for path in all_runs
+    ]
+    # Returns merged stream of run records
+    return heapq.merge(
+        *[map(json.loads, run_file) for run_file in run_files],
+        key=lambda record: record[:3]
+    )
+
+def combine_runs(all_runs):
+    """
+    Merges sorted run files into single sorted intermediate run file in
+    directory of first run file. Used by merge_runs() to bound number of
+    open run files.
+
+    Args:
+        all_runs (list of strings): contains paths to run files.
+
+    Returns:
+        run_path (string): path to intermediate run file.
+    """
+    # Creates intermediate run file in directory of run files
+    run_handle, run_path = tempfile.mkstemp(
+        prefix="pharmacopedia_run_", suffix=".txt",
+        dir=os.path.dirname(all_runs[0]),
+    )
+    # If True, merge fails and intermediate run file is removed
+    try:
+        # Safely opens and closes all run files
+        with open(run_handle, 'w', encoding="utf-8") as run_file, \
+                contextlib.ExitStack() as run_stack:
+            # Iterates over merged run records
+            for record in merge_records(run_stack, all_runs):
+                # Writes run record as single line
+                run_file.write(json.dumps(record) + "\n")
+    except BaseException:
+        # Removes incomplete intermediate run file
+        os.remove(run_path)
+        # Raises original error
+        raise
+    # Returns path to intermediate run file
+    return run_path
+
+def filter_costs(processed_data, min_cost=None, max_cost=None):
+    """
+    Removes drugs with total cost outside of specified cost range. Total cost
+    is only known after analysis, so cost range is applied to processed data
+    rather than during import.
+
+    Args:
+        processed_data (dictionary): contains all analyzed data. Primary key
+            is drug name (string), and primary value is tuple containing
+            number of prescribers (integer, index 0) and total cost (float,
+            index 1).
+        min_cost (float or None): minimum total cost. If None, not limited.
+        max_cost (float or None): maximum total cost. If None, not limited.
+
+    Returns:
+        processed_data (dictionary): contains analyzed data for drugs with
+            total cost inside cost range.
+    """
+    # If no cost limits are specified, returns all analyzed data
+    if min_cost is None and max_cost is None:
+        # Returns dictionary of analyzed data
+        return processed_data
+    # Sets lower and upper cost limits
+    lower = float("-inf") if min_cost is None else min_cost
+    upper = float("inf") if max_cost is None else max_cost
+    # Returns dictionary of analyzed data inside cost range
+    return {
+        drug: values for drug, values in processed_data.items()
+        if lower <= values[1] <= upper
+    }
+
 def sort_drugs(processed_data, alpha_sort, **kwargs):
     """
     Sorts all drug names, as primary keys of processed data dictionary. Sorting
@@ -122,7 +376,8 @@ def sort_drugs(processed_data, alpha_sort, **kwargs):
             drug (string): drug name.
 
         Returns:
-            (tuple): ordered and mapped sorting criteria of cost and name.
+            (tuple): ordered and mapped sorting criteria of cost, corrected
+                name, and original name.
         """
         # Sets first criteria of decreasing drug cost
         cost_criteria = - processed_data[drug][1]
@@ -136,8 +391,10 @@ def sort_drugs(processed_data, alpha_sort, **kwargs):
                 if char not in safe_char:
                     # Removes special characters
                     name_criteria = name_criteria.replace(char,"")
-        # Returns primary and secondary sorting criteria
-        return (cost_criteria, name_criteria)
+        # Returns primary and secondary sorting criteria. Original drug name
+        # is final criteria, so that order of drugs with same cost and
+        # same corrected name does not depend on dictionary order
+        return (cost_criteria, name_criteria, drug)
 
     # Sets safe characters for evaluation of name criteria
     safe_char = kwargs['ch']
@@ -146,6 +403,440 @@ def sort_drugs(processed_data, alpha_sort, **kwargs):
     # Returns list of sorted drug names
     return all_drugs_sorted
 
+def diff_data(old_data, new_data, alpha_sort, **kwargs):
+    """
+    Compares analyzed data of two runs. Drugs of each run are ranked with
+    the sort_drugs() function, so that ranks match exported reports. Drugs
+    are matched by drug name, or by canonical drug name if key function is
+    given, so that displayed spellings of both runs may differ. Time is
+    proportional to number of drugs, not to input size.
+
+    Args:
+        old_data (dictionary): contains analyzed data of previous run.
+        new_data (dictionary): contains analyzed data of current run.
+        alpha_sort (boolean): if True, special characters are not considered
+            during sorting.
+        safe_char (list of strings): contains all characters considered safe.
+        key (function or None): returns canonical drug name of displayed
+            drug name. Drugs of one run with same canonical name are combined
+            using the combine_names() function. If None, drugs are matched by
+            displayed drug name.
+
+    Returns:
+        diff_rows (list of tuples): contains drug name, status ("new",
+            "removed", "changed", or "unchanged"), and previous and current
+            rank, number of prescribers, and total cost. Values of missing
+            run are None. Drugs of current run are listed in current rank
+            order, followed by removed drugs in previous rank order.
+    """
+    # Sets key function which matches drugs of both runs
+    key = kwargs.get('key')
+    # If True, combines drugs of each run with same canonical name
+    if key is not None:
+        old_data = combine_names(old_data, key)
+        new_data = combine_names(new_data, key)
+    # Else, matches drugs by displayed name
+    else:
+        key = str
+    # Sorts drugs of both runs
+    old_sorted = sort_drugs(old_data, alpha_sort, ch=kwargs['ch'])
+    new_sorted = sort_drugs(new_data, alpha_sort, ch=kwargs['ch'])
+    # Sets rank and displayed name of each drug in previous run by matched
+    # name, and matched names of current run
+    old_ranks = {key(drug): rank for rank, drug in enumerate(old_sorted, 1)}
+    old_names = {key(drug): drug for drug in old_data}
+    new_keys = {key(drug) for drug in new_data}
+    # Sets empty collection of compared drugs
+    diff_rows = []
+    # Iterates over drugs of current run in rank order
+    for new_rank, drug in enumerate(new_sorted, 1):
+        # Sets values of previous run, if any
+        old_rank = old_ranks.get(key(drug))
+        old_values = old_data.get(old_names.get(key(drug)), (None, None))
+        # Sets status of drug
+        if old_rank is None:
+            status = "new"
+        elif tuple(old_values) != tuple(new_data[drug]) or old_rank != new_rank:
+            status = "changed"
+        else:
+            status = "unchanged"
+        # Saves compared drug
+        diff_rows.append((
+            drug, status, old_rank, new_rank,
+            old_values[0], new_data[drug][0], old_values[1], new_data[drug][1],
+        ))
+    # Iterates over drugs of previous run in rank order
+    for old_rank, drug in enumerate(old_sorted, 1):
+        # If True, drug was removed in current run
+        if key(drug) not in new_keys:
+            # Saves removed drug
+            diff_rows.append((
+                drug, "removed", old_rank, None,
+                old_data[drug][0], None, old_data[drug][1], None,
+            ))
+    # Returns compared drugs
+    return diff_rows
+
+def combine_names(processed_data, key):
+    """
+    Combines drugs of analyzed data with same canonical drug name, such as
+    drugs of snapshot analyzed without canonical drug names. Prescriber
+    counts and costs are added, and combined drug is shown with spelling of
+    highest cost. Used by diff_data().
+
+    Args:
+        processed_data (dictionary): contains analyzed data.
+        key (function): returns canonical drug name of displayed drug name.
+
+    Returns:
+        combined_data (dictionary): contains analyzed data with one drug for
+            each canonical drug name.
+    """
+    # Sets empty dictionaries of combined data and displayed names
+    combined_data = {}
+    all_names = {}
+    # Iterates over drugs in decreasing cost order, so that spelling of
+    # highest cost is shown
+    for drug in sorted(processed_data, key=lambda d: -processed_data[d][1]):
+        # Sets displayed name of drugs with same canonical name
+        name = all_names.setdefault(key(drug), drug)
+        # If True, adds values to drug with same canonical name
+        if name in combined_data:
+            combined_data[name] = [
+                combined_data[name][0] + processed_data[drug][0],
+                combined_data[name][1] + processed_data[drug][1],
+            ]
+        # Else, saves values of drug
+        else:
+            combined_data[name] = processed_data[drug]
+    # Returns combined data
+    return combined_data
+
+def estimate_data(sample_data, summary):
+    """
+    Estimates prescriber count and total cost of each drug from sampled
+    blocks of input file. Sampled blocks are analyzed separately using the
+    analyze_data() function, and block values are scaled by total number of
+    blocks. Confidence interval margins are calculated from variance between
+    sampled blocks, with finite population correction so that margins are
+    zero if all blocks are sampled. Prescriber count is estimated as sum over
+    blocks, which assumes that each prescriber is listed once for each drug,
+    as in CMS data. Drugs not found in any sampled block are not estimated.
+
+    Args:
+        sample_data (list of dictionaries): contains import data of each
+            sampled block from import_data() function.
+        summary (dictionary): contains total number of blocks (integer, key
+            "sample_blocks"). Confidence level (float, key "confidence") is
+            added.
+
+    Returns:
+        processed_data (dictionary): contains estimated data. Primary key is
+            drug name (string), and primary value is tuple containing
+            estimated number of prescribers (integer, index 0) and total cost
+            (float, index 1).
+        margins (dictionary): contains confidence interval margins. Primary
+            key is drug name (string), and primary value is tuple containing
+            margin of number of prescribers (float, index 0) and total cost
+            (float, index 1).
+    """
+    # Adds confidence level to run summary
+    summary["confidence"] = confidence_level
+    # Sets number of sampled blocks and total number of blocks
+    num_sampled = len(sample_data)
+    num_blocks = summary.get("sample_blocks", num_sampled)
+    # If True, no data entries are sampled
+    if not num_sampled:
+        # Returns empty estimates
+        return {}, {}
+    # Sets critical value of confidence level from normal distribution
+    z = get_critical_value(confidence_level)
+    # Sets scale from sampled blocks to all blocks
+    scale = num_blocks / num_sampled
+    # Sets finite population correction of variance
+    correction = 1 - num_sampled / num_blocks
+
+    def estimate(block_values):
+        """
+        Returns scaled total and confidence interval margin from values of
+        sampled blocks, including blocks without drug. Required by
+        estimate_data() outer function.
+        """
+        # Sets total over sampled blocks
+        total = math.fsum(block_values)
+        # If True, variance between blocks cannot be calculated
+        if num_sampled < 2 or correction <= 0:
+            # Returns scaled total without margin
+            return scale * total, 0.0
+        # Sets variance between sampled blocks
+        mean = total / num_sampled
+        variance = math.fsum((x - mean) ** 2 for x in block_values) / (num_sampled - 1)
+        # Returns scaled total and margin
+        return (
+            scale * total,
+            z * num_blocks * math.sqrt(correction * variance / num_sampled),
+        )
+
+    # Analyzes each sampled block separately
+    all_blocks = [analyze_data(block_data) for block_data in sample_data]
+    # Sets empty dictionaries for estimates and margins
+    processed_data = {}
+    margins = {}
+    # Iterates over all drugs found in sampled blocks, in order of first
+    # appearance
+    for drug in dict.fromkeys(d for block in all_blocks for d in block):
+        # Sets prescriber count and total cost of drug in each sampled block
+        counts = [block.get(drug, (0, 0.0))[0] for block in all_blocks]
+        costs = [block.get(drug, (0, 0.0))[1] for block in all_blocks]
+        # Estimates prescriber count and total cost with margins
+        num_prescriber, num_margin = estimate(counts)
+        total_cost, cost_margin = estimate(costs)
+        # Adds estimates and margins of drug
+        processed_data[drug] = (round(num_prescriber), total_cost)
+        margins[drug] = (num_margin, cost_margin)
+    # Returns estimates and margins to script
+    return processed_data, margins
+
+
+## SECONDARY FUNCTIONS
+
+def get_critical_value(confidence):
+    """
+    Returns critical value of two-sided confidence interval from standard
+    normal distribution (e.g., 1.96 for 0.95). Normal distribution function
+    is inverted by bisection with math.erf(), so that Python 3.6 is
+    supported. Required by estimate_data() function.
+
+    Args:
+        confidence (float): confidence level between 0 and 1.
+
+    Returns:
+        z (float): critical value.
+    """
+    # Sets bounds of critical value
+    low, high = 0.0, 40.0
+    # Halves bounds until bounds are equal in floating point
+    for _ in range(100):
+        # Sets midpoint of bounds
+        z = (low + high) / 2
+        # If True, interval of midpoint covers too much probability
+        if math.erf(z / math.sqrt(2)) > confidence:
+            high = z
+        # Else, interval of midpoint covers too little probability
+        else:
+            low = z
+    # Returns critical value
+    return (low + high) / 2
+
+def add_partials(partials, x):
+    """
+    Adds number to list of non-overlapping partial sums without rounding
+    error, using Shewchuk's algorithm. Exact sum is retrieved by wrapping
+    partial sums with math.fsum() function. Required by merge_runs().
+
+    Args:
+        partials (list of floats): contains non-overlapping partial sums.
+        x (float): number to add.
+
+    Returns:
+        None.
+    """
+    # Sets index of next kept partial sum
+    i = 0
+    # Iterates over all partial sums
+    for y in partials:
+        # Ensures larger magnitude is added first
+        if abs(x) < abs(y):
+            x, y = y, x
+        # Sets rounded sum and its rounding error
+        hi = x + y
+        lo = y - (hi - x)
+        # If True, keeps rounding error as partial sum
+        if lo:
+            partials[i] = lo
+            i += 1
+        # Carries rounded sum to next partial sum
+        x = hi
+    # Replaces remaining partial sums with carried sum
+    partials[i:] = [x]
+    # Completes exact addition
+    return None
+
+
+## CLASSES
+
+class CostSketch:
+    """
+    Summarizes distribution of prescriber net costs for single drug in one
+    streaming pass. Count, minimum, maximum, and exact sum are kept exactly.
+    Quantiles are estimated using KLL sketch of fixed size: values are kept
+    in levels of compactors, and full compactors are sorted and halved, with
+    each kept value weighing twice as much in the next level. Quantiles are
+    exact until first compaction, after "sketch_size" values. Sketches can
+    be merged with the merge() method. Used by analyze_data() and
+    merge_runs().
+    """
+
+    def __init__(self, k=None):
+        # Sets size parameter, which governs accuracy and memory
+        self.k = sketch_size if k is None else k
+        # Sets empty compactors, beginning with level 0
+        self.compactors = [[]]
+        # Sets number of kept values and maximum before compaction
+        self.size = 0
+        self.max_size = self.capacity(0)
+        # Sets alternating choice of kept values during compaction
+        self.odd = False
+        # Sets exact count, minimum, maximum, and partial sums
+        self.count = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.partials = []
+
+    def capacity(self, level):
+        """
+        Returns capacity of compactor. Lower levels have geometrically smaller
+        capacity, so that total size is bounded by about 3 times k.
+        """
+        # Sets number of levels above compactor
+        depth = len(self.compactors) - level - 1
+        # Returns capacity of compactor
+        return int(math.ceil(self.k * (2 / 3) ** depth)) + 1
+
+    def update(self, x):
+        """
+        Adds single value to sketch.
+
+        Args:
+            x (float): prescriber net cost.
+
+        Returns:
+            None.
+        """
+        # Updates exact count, minimum, maximum, and sum
+        self.count += 1
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        add_partials(self.partials, x)
+        # Adds value to lowest compactor
+        self.compactors[0].append(x)
+        self.size += 1
+        # If True, sketch is full and is compacted
+        if self.size >= self.max_size:
+            # Compacts sketch
+            self.compress()
+        # Completes update
+        return None
+
+    def merge(self, other):
+        """
+        Adds all values summarized by other sketch to sketch.
+
+        Args:
+            other (CostSketch): sketch to merge.
+
+        Returns:
+            None.
+        """
+        # Merges exact count, minimum, maximum, and sum
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for x in other.partials:
+            add_partials(self.partials, x)
+        # Adds levels until sketch has as many levels as other sketch
+        while len(self.compactors) < len(other.compactors):
+            self.grow()
+        # Joins compactors of same level
+        for level, compactor in enumerate(other.compactors):
+            self.compactors[level].extend(compactor)
+        # Compacts sketch
+        self.size = sum(len(compactor) for compactor in self.compactors)
+        self.compress()
+        # Completes merge
+        return None
+
+    def grow(self):
+        """
+        Adds new highest compactor and updates maximum size.
+        """
+        # Adds empty compactor
+        self.compactors.append([])
+        # Sets maximum size over all levels
+        self.max_size = sum(
+            self.capacity(level) for level in range(len(self.compactors))
+        )
+        # Completes growth
+        return None
+
+    def compress(self):
+        """
+        Halves full compactors, beginning with lowest level, until sketch
+        is below maximum size.
+        """
+        # Iterates over all levels, including levels added during compaction
+        level = 0
+        while level < len(self.compactors) and self.size >= self.max_size:
+            # If True, compactor is full
+            if len(self.compactors[level]) >= self.capacity(level):
+                # If True, adds next level
+                if level + 1 == len(self.compactors):
+                    self.grow()
+                # Sorts compactor; odd value count keeps last value in level
+                compactor = sorted(self.compactors[level])
+                kept = [compactor.pop()] if len(compactor) % 2 else []
+                # Moves every second value to next level
+                self.compactors[level + 1].extend(compactor[int(self.odd)::2])
+                self.compactors[level] = kept
+                self.odd = not self.odd
+                # Updates number of kept values
+                self.size = sum(len(c) for c in self.compactors)
+            # Moves to next level
+            level += 1
+        # Completes compaction
+        return None
+
+    def quantile(self, q):
+        """
+        Returns nearest-rank estimate of quantile.
+
+        Args:
+            q (float): quantile between 0 and 1 (e.g., 0.5 for median).
+
+        Returns:
+            (float): smallest value with cumulative weight of at least q.
+        """
+        # Sets all kept values with weight of their level
+        weighted = sorted(
+            (x, 2 ** level)
+            for level, compactor in enumerate(self.compactors)
+            for x in compactor
+        )
+        # Sets target cumulative weight
+        target = q * sum(weight for x, weight in weighted)
+        # Iterates over values in increasing order
+        cumulative = 0
+        for x, weight in weighted:
+            # If True, value reaches target weight
+            cumulative += weight
+            if cumulative >= target:
+                return x
+        # Returns maximum for empty target
+        return self.max
+
+    def summary(self):
+        """
+        Returns minimum, maximum, mean, median, and 95th percentile.
+
+        Returns:
+            (tuple of floats): distribution statistics of prescriber costs.
+        """
+        # Returns distribution statistics
+        return (
+            self.min, self.max, math.fsum(self.partials) / self.count,
+            self.quantile(0.5), self.quantile(0.95),
+        )
+
 
 ## MODULE METADATA
 
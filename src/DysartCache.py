@@ -0,0 +1,543 @@
+# -*- coding: utf-8 -*-
+"""
+Pharmacopedia.Py v1.0
+Pharmacy Counting Project
+Arhur D. Dysart
+
+
+DESCRIPTION
+
+Analyzes and organizes medical pharmacy data. Using data from the Centers for
+Medicare & Medicaid Services, this script calculates: (1) total number of
+prescribers and (2) total prescriber expenditure for all listed drugs. Exports
+analyzed data to text file with drugs organized by decreasing cost and, where
+required, alphanumeric order. Created on 13:34:50 Wednesday, July 11, 2018.
+
+This module contains functions required for caching of analysis results,
+including content fingerprints of input files, snapshots of analyzed data
+used to compare runs, and exported results of repeated runs.
+
+Script metadata available at end of module.
+
+
+MIT LICENSE
+
+Copyright (c) 2018 Arthur D. Dysart
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+## REQUIRED MODULES
+
+# Calculates content fingerprints and cache file names
+import hashlib
+# Reads and writes snapshots and fingerprint records
+import json
+# Creates, replaces, and inspects cache files
+import os
+# Copies exported results to and from cache directory
+import shutil
+# Writes cache files to temporary file before replacement; sets default
+# cache directory
+import tempfile
+
+
+## MODULE SETTINGS
+
+# Sets default cache directory
+cache_dir = os.path.join(tempfile.gettempdir(), "pharmacopedia_cache")
+# Sets file name of fingerprint records in cache directory
+fingerprint_name = "fingerprints.json"
+# Sets size in bytes of blocks read during fingerprinting
+fingerprint_block = 1024 ** 2
+# Sets maximum number of fingerprint records; oldest records are removed
+fingerprint_records = 1024
+# Sets snapshot format version; snapshots of other versions are ignored
+snapshot_version = 1
+# Sets flags which change analyzed data; snapshots with other values for
+# these flags are not used
+snapshot_options = [
+    "drugs", "prefix", "dedup", "dedup_fpr", "dedup_capacity", "canonical",
+]
+# Sets result format version; results of other versions are ignored
+result_version = 1
+# Sets flags which change exported results; results with other values for
+# these flags are not used
+result_options = snapshot_options + ["min_cost", "max_cost", "stats"]
+# Sets default size limit of cached results in megabytes
+result_cache_size = 256
+
+
+## PRIMARY FUNCTIONS
+
+def set_cache_dir(options):
+    """
+    Interprets cache directory from terminal flags and creates directory if
+    required.
+
+    Args:
+        options (dictionary): contains flag values with flag name as key.
+
+    Returns:
+        target_dir (string): path to cache directory.
+    """
+    # Sets cache directory, by default in system temporary directory
+    target_dir = options.get("cache_dir")
+    target_dir = target_dir if isinstance(target_dir, str) else cache_dir
+    # Creates cache directory if required
+    os.makedirs(target_dir, exist_ok=True)
+    # Returns path to cache directory
+    return target_dir
+
+def get_fingerprint(import_path, target_dir):
+    """
+    Returns content fingerprint of input file. Fingerprint is BLAKE2 digest
+    of file size and content. Fingerprints are recorded in cache directory
+    with file path, size, and modification time, so that unchanged files are
+    only read once.
+
+    Args:
+        import_path (string): path to input file.
+        target_dir (string): path to cache directory.
+
+    Returns:
+        fingerprint (string): hexadecimal content fingerprint.
+    """
+    # Retrieves size and modification time of input file
+    file_stat = os.stat(import_path)
+    # Sets record name from file path, size, and modification time
+    record = "{}|{}|{}".format(
+        os.path.abspath(import_path), file_stat.st_size, file_stat.st_mtime_ns
+    )
+    # Sets path to fingerprint records
+    records_path = os.path.join(target_dir, fingerprint_name)
+    # Reads fingerprint records; missing or damaged records are ignored
+    records = read_json(records_path) or {}
+    # If True, unchanged file was already fingerprinted
+    if record in records:
+        # Returns recorded fingerprint
+        return records[record]
+    # Sets digest of file size
+    digest = hashlib.blake2b(str(file_stat.st_size).encode(), digest_size=20)
+    # Safely opens and closes file for reading
+    with open(import_path, 'rb') as target_file:
+        # Iterates over all blocks of file
+        for block in iter(lambda: target_file.read(fingerprint_block), b""):
+            # Adds block to digest
+            digest.update(block)
+    # Sets content fingerprint
+    fingerprint = digest.hexdigest()
+    # Removes records of earlier versions of file, which cannot match again
+    prefix = record.rsplit("|", 2)[0] + "|"
+    records = {
+        name: value for name, value in records.items()
+        if not name.startswith(prefix)
+    }
+    # Records fingerprint
+    records[record] = fingerprint
+    # Removes oldest records above maximum number of records
+    records = dict(list(records.items())[-fingerprint_records:])
+    write_json(records_path, records)
+    # Returns content fingerprint
+    return fingerprint
+
+def get_snapshot_key(import_path, options, target_dir):
+    """
+    Identifies analyzed data by content fingerprint of input file and flags
+    which change analyzed data.
+
+    Args:
+        import_path (string): path to input file.
+        options (dictionary): contains flag values with flag name as key.
+        target_dir (string): path to cache directory.
+
+    Returns:
+        key (dictionary): identifies analyzed data.
+    """
+    # Returns input fingerprint and flags which change analyzed data
+    return {
+        "fingerprint": get_fingerprint(import_path, target_dir),
+        "options": get_option_values(options, snapshot_options, target_dir),
+    }
+
+def save_snapshot(target_dir, key, processed_data):
+    """
+    Writes snapshot of analyzed data to cache directory. Snapshot file name
+    is digest of key.
+
+    Args:
+        target_dir (string): path to cache directory.
+        key (dictionary): identifies analyzed data.
+        processed_data (dictionary): contains all analyzed data. Primary key
+            is drug name (string), and primary value is tuple containing
+            number of prescribers (integer, index 0) and total cost (float,
+            index 1).
+
+    Returns:
+        snapshot_path (string): path to snapshot.
+    """
+    # Sets path to snapshot
+    snapshot_path = get_snapshot_path(target_dir, key)
+    # Writes snapshot version, key, and analyzed data
+    write_json(snapshot_path, {
+        "version": snapshot_version,
+        "key": key,
+        "drugs": processed_data,
+    })
+    # Returns path to snapshot
+    return snapshot_path
+
+def load_snapshot(snapshot_path, key=None):
+    """
+    Reads snapshot of analyzed data. Snapshot is valid if it can be read
+    and matches snapshot version and, if specified, key.
+
+    Args:
+        snapshot_path (string): path to snapshot.
+        key (dictionary or None): identifies analyzed data. If None, key of
+            snapshot is not checked.
+
+    Returns:
+        processed_data (dictionary or None): contains all analyzed data. If
+            None, no valid snapshot is found.
+    """
+    # Reads snapshot; missing or damaged snapshots are ignored
+    snapshot = read_json(snapshot_path)
+    # If True, snapshot is missing or belongs to other version or key
+    if not isinstance(snapshot, dict) or \
+            snapshot.get("version") != snapshot_version or \
+            (key is not None and snapshot.get("key") != key):
+        # Returns empty analyzed data
+        return None
+    # Returns analyzed data with tuple of prescriber count and total cost
+    return {drug: tuple(values) for drug, values in snapshot["drugs"].items()}
+
+def get_snapshot_path(target_dir, key):
+    """
+    Returns path to snapshot of analyzed data in cache directory.
+
+    Args:
+        target_dir (string): path to cache directory.
+        key (dictionary): identifies analyzed data.
+
+    Returns:
+        snapshot_path (string): path to snapshot.
+    """
+    # Returns path to snapshot
+    return os.path.join(target_dir, get_name("snapshot", key))
+
+def set_result_cache(options):
+    """
+    Interprets result cache directory and size limit from terminal flags.
+
+    Args:
+        options (dictionary): contains flag values with flag name as key.
+
+    Returns:
+        target_dir (string or None): path to cache directory. If None,
+            results are not cached.
+        size_limit (integer): size limit of cached results in bytes.
+
+    Raises:
+        ValueError: size limit is not a positive number.
+    """
+    # If result cache is not requested, results are not cached
+    if not options.get("cache"):
+        # Returns empty cache directory
+        return None, 0
+    # If size limit is not a positive number, raises value error
+    try:
+        # Sets size limit in bytes
+        size_limit = int(
+            float(options.get("cache_size", result_cache_size)) * 1024 ** 2
+        )
+        # If True, size limit is not positive
+        if size_limit <= 0:
+            # Raises error for non-positive size limit
+            raise ValueError
+    except (TypeError, ValueError):
+        # Raises error for non-numeric size limit
+        raise ValueError(
+            "Option \"--cache-size\" requires positive value in megabytes."
+            "\nCheck then run again."
+        )
+    # Returns cache directory and size limit to script
+    return set_cache_dir(options), size_limit
+
+def get_result_key(import_path, options, target_dir, settings):
+    """
+    Identifies exported result by content fingerprint of input file, flags
+    which change exported result, script settings, and digest of script
+    modules, so that results of earlier code are not reused.
+
+    Args:
+        import_path (string): path to input file.
+        options (dictionary): contains flag values with flag name as key.
+        target_dir (string): path to cache directory.
+        settings (dictionary): contains script settings which change exported
+            result, such as sorting option, cost precision, and safe
+            characters.
+
+    Returns:
+        key (dictionary): identifies exported result.
+    """
+    # Returns result version, input fingerprint, flags, script settings, and
+    # code digest
+    return {
+        "version": result_version,
+        "fingerprint": get_fingerprint(import_path, target_dir),
+        "options": get_option_values(options, result_options, target_dir),
+        "settings": settings,
+        "code": get_code_digest(),
+    }
+
+def load_result(target_dir, key, export_path):
+    """
+    Copies cached result to export path. Cached result is marked as recently
+    used, so that it is evicted last.
+
+    Args:
+        target_dir (string): path to cache directory.
+        key (dictionary): identifies exported result.
+        export_path (string): path to output file.
+
+    Returns:
+        (boolean): if True, cached result is found and copied.
+    """
+    # Sets path to cached result
+    result_path = os.path.join(target_dir, get_name("result", key, ".txt"))
+    # If cached result cannot be read, result is not cached
+    try:
+        # Copies cached result to export path
+        shutil.copyfile(result_path, export_path)
+    except OSError:
+        # Returns missing result
+        return False
+    # Marks cached result as recently used, unless result was evicted by
+    # concurrent run after copy
+    try:
+        os.utime(result_path)
+    except FileNotFoundError:
+        pass
+    # Returns found result
+    return True
+
+def save_result(target_dir, key, export_path, size_limit):
+    """
+    Copies exported result to cache directory, then evicts least recently
+    used results until cached results are within size limit.
+
+    Args:
+        target_dir (string): path to cache directory.
+        key (dictionary): identifies exported result.
+        export_path (string): path to output file.
+        size_limit (integer): size limit of cached results in bytes.
+
+    Returns:
+        None.
+    """
+    # Sets path to cached result
+    result_path = os.path.join(target_dir, get_name("result", key, ".txt"))
+    # Creates temporary file in cache directory
+    temp_handle, temp_path = tempfile.mkstemp(suffix=".tmp", dir=target_dir)
+    os.close(temp_handle)
+    # Copies exported result to temporary file, which replaces cached result
+    shutil.copyfile(export_path, temp_path)
+    os.replace(temp_path, result_path)
+    # Evicts least recently used results
+    evict_results(target_dir, size_limit)
+    # Completes caching
+    return None
+
+
+## SECONDARY FUNCTIONS
+
+def get_option_values(options, names, target_dir):
+    """
+    Returns values of listed flags. If drug list is given as path to text
+    file, content fingerprint of text file is added, so that changes of drug
+    list are detected.
+
+    Args:
+        options (dictionary): contains flag values with flag name as key.
+        names (list of strings): flag names.
+        target_dir (string): path to cache directory.
+
+    Returns:
+        values (dictionary): contains flag values with flag name as key.
+    """
+    # Sets values of listed flags
+    values = {name: options.get(name) for name in names}
+    # Sets drug list flag
+    drugs = values.get("drugs")
+    # If True, drug list is text file
+    if isinstance(drugs, str) and os.path.isfile(drugs):
+        # Adds content fingerprint of drug list
+        values["drugs_file"] = get_fingerprint(drugs, target_dir)
+    # Returns flag values
+    return values
+
+def evict_results(target_dir, size_limit):
+    """
+    Removes least recently used results until total size of cached results
+    is within size limit. Recent use is recorded as modification time.
+
+    Args:
+        target_dir (string): path to cache directory.
+        size_limit (integer): size limit of cached results in bytes.
+
+    Returns:
+        None.
+    """
+    # Sets empty list of cached results
+    all_results = []
+    # Iterates over all cache files
+    for name in os.listdir(target_dir):
+        # If True, cache file is cached result
+        if name.startswith("result_") and name.endswith(".txt"):
+            # Adds modification time, size, and path of cached result;
+            # results evicted by concurrent run are skipped
+            result_path = os.path.join(target_dir, name)
+            try:
+                result_stat = os.stat(result_path)
+            except FileNotFoundError:
+                continue
+            all_results.append(
+                (result_stat.st_mtime_ns, result_stat.st_size, result_path)
+            )
+    # Sets total size of cached results
+    total_size = sum(result[1] for result in all_results)
+    # Iterates over cached results from least recently used
+    for mtime, size, result_path in sorted(all_results):
+        # If True, cached results are within size limit
+        if total_size <= size_limit:
+            # Ends eviction
+            break
+        # Removes cached result, unless already removed by concurrent run
+        try:
+            os.remove(result_path)
+        except FileNotFoundError:
+            pass
+        total_size -= size
+    # Completes eviction
+    return None
+
+def get_code_digest():
+    """
+    Returns digest of all script modules in script directory, so that
+    cached results are not reused after code changes. Required by
+    get_result_key() function.
+
+    Returns:
+        (string): hexadecimal digest of script modules.
+    """
+    # Sets script directory
+    code_dir = os.path.dirname(os.path.abspath(__file__))
+    # Sets empty digest
+    digest = hashlib.blake2b(digest_size=16)
+    # Iterates over all script modules in sorted order
+    for name in sorted(os.listdir(code_dir)):
+        # If True, file is script module
+        if name.endswith(".py"):
+            # Safely opens and closes script module for reading
+            with open(os.path.join(code_dir, name), 'rb') as code_file:
+                # Adds module name and content to digest
+                digest.update(name.encode() + b"\0" + code_file.read())
+    # Returns digest of script modules
+    return digest.hexdigest()
+
+def get_name(prefix, key, suffix=".json"):
+    """
+    Returns cache file name from digest of key.
+
+    Args:
+        prefix (string): type of cache file.
+        key (dictionary): identifies cache file content.
+        suffix (string): file extension of cache file.
+
+    Returns:
+        (string): cache file name.
+    """
+    # Sets digest of key with sorted dictionary keys
+    digest = hashlib.blake2b(
+        json.dumps(key, sort_keys=True).encode(), digest_size=16
+    ).hexdigest()
+    # Returns cache file name
+    return "{}_{}{}".format(prefix, digest, suffix)
+
+def read_json(target_path):
+    """
+    Reads JSON file. Missing or damaged files are returned as None.
+
+    Args:
+        target_path (string): path to JSON file.
+
+    Returns:
+        (object or None): content of JSON file.
+    """
+    # If file cannot be read, returns None
+    try:
+        # Safely opens and closes file for reading
+        with open(target_path, 'r', encoding="utf-8") as target_file:
+            # Returns content of JSON file
+            return json.load(target_file)
+    except (OSError, ValueError):
+        # Returns empty content
+        return None
+
+def write_json(target_path, content):
+    """
+    Writes JSON file atomically: content is written to temporary file in same
+    directory, which then replaces target file.
+
+    Args:
+        target_path (string): path to JSON file.
+        content (object): content of JSON file.
+
+    Returns:
+        None.
+    """
+    # Creates temporary file in target directory
+    temp_handle, temp_path = tempfile.mkstemp(
+        suffix=".tmp", dir=os.path.dirname(target_path),
+    )
+    # Safely opens and closes temporary file for writing
+    with open(temp_handle, 'w', encoding="utf-8") as temp_file:
+        # Writes content
+        json.dump(content, temp_file)
+    # Replaces target file
+    os.replace(temp_path, target_path)
+    # Completes writing
+    return None
+
+
+## MODULE METADATA
+
+__author__ = 'Arthur D. Dysart'
+__copyright__ = 'Copyright 2018, Pharmacopedia.Py'
+__credits__ = ['Arthur D. Dysart']
+__license__ = 'MIT License'
+__version__ = '1.0.0'
+__maintainer__ = 'Arthur D. Dysart'
+__email__ = 'hi@arthurdys.art'
+__status__ = 'closed'
+
+
+## END OF MODULE
\ No newline at end of file
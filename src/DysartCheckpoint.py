@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+Pharmacopedia.Py v1.0
+Pharmacy Counting Project
+Arhur D. Dysart
+
+
+DESCRIPTION
+
+Analyzes and organizes medical pharmacy data. Using data from the Centers for
+Medicare & Medicaid Services, this script calculates: (1) total number of
+prescribers and (2) total prescriber expenditure for all listed drugs. Exports
+analyzed data to text file with drugs organized by decreasing cost and, where
+required, alphanumeric order. Created on 13:34:50 Wednesday, July 11, 2018.
+
+This module contains functions required for checkpoints of import state,
+which enable long-running imports to resume after interruption.
+
+Script metadata available at end of module.
+
+
+MIT LICENSE
+
+Copyright (c) 2018 Arthur D. Dysart
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+## REQUIRED MODULES
+
+# Creates, replaces, and removes checkpoint files
+import os
+# Serializes import state
+import pickle
+# Writes checkpoint to temporary file before replacement
+import tempfile
+
+
+## MODULE SETTINGS
+
+# Sets file names of latest and previous checkpoints in checkpoint directory
+checkpoint_names = ["checkpoint.pkl", "checkpoint.prev.pkl"]
+# Sets file name prefix of run files, which hold entries imported between
+# checkpoints
+run_prefix = "checkpoint_run_"
+# Sets file name prefixes and suffixes of temporary checkpoints and of
+# spilled run files, which are left in checkpoint directory by interrupted
+# runs
+stale_files = [("checkpoint_", ".tmp"), ("pharmacopedia_run_", ".txt")]
+# Sets checkpoint format version; checkpoints of other versions are ignored
+checkpoint_version = 3
+# Sets flags which change import state; checkpoints with other values for
+# these flags are not resumed
+state_options = [
+    "drugs", "prefix", "dedup", "dedup_fpr", "dedup_capacity", "canonical",
+]
+
+
+## PRIMARY FUNCTIONS
+
+def get_key(import_path, options):
+    """
+    Identifies input file and import settings for checkpoint validation. Input
+    file is identified by absolute path, size, and modification time, so that
+    checkpoints of modified files are not resumed.
+
+    Args:
+        import_path (string): path to input file.
+        options (dictionary): contains flag values with flag name as key.
+
+    Returns:
+        key (dictionary): identifies input file and import settings.
+    """
+    # Retrieves size and modification time of input file
+    file_stat = os.stat(import_path)
+    # Returns input file identity and flags which change import state
+    return {
+        "import_path": os.path.abspath(import_path),
+        "size": file_stat.st_size,
+        "mtime_ns": file_stat.st_mtime_ns,
+        "options": {name: options.get(name) for name in state_options},
+    }
+
+def save_checkpoint(state_dir, key, state):
+    """
+    Writes import state to checkpoint directory. Checkpoint is written to
+    temporary file, flushed to disk, and then atomically renamed, so that an
+    interrupted write never replaces a valid checkpoint. Previous checkpoint
+    is kept as fallback.
+
+    Args:
+        state_dir (string): path to checkpoint directory.
+        key (dictionary): identifies input file and import settings.
+        state (dictionary): contains import state and byte offset.
+
+    Returns:
+        None.
+    """
+    # Creates checkpoint directory if required
+    os.makedirs(state_dir, exist_ok=True)
+    # Sets paths to latest and previous checkpoints
+    latest_path, previous_path = [
+        os.path.join(state_dir, name) for name in checkpoint_names
+    ]
+    # Creates temporary file in checkpoint directory
+    temp_handle, temp_path = tempfile.mkstemp(
+        prefix="checkpoint_", suffix=".tmp", dir=state_dir,
+    )
+    # Safely opens and closes temporary file for writing
+    with open(temp_handle, 'wb') as temp_file:
+        # Writes checkpoint version, key, and import state
+        pickle.dump(
+            {"version": checkpoint_version, "key": key, "state": state},
+            temp_file, protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        # Flushes checkpoint to disk
+        temp_file.flush()
+        os.fsync(temp_file.fileno())
+    # If True, keeps latest checkpoint as previous checkpoint
+    if os.path.isfile(latest_path):
+        # Replaces previous checkpoint
+        os.replace(latest_path, previous_path)
+    # Replaces latest checkpoint
+    os.replace(temp_path, latest_path)
+    # Completes checkpoint
+    return None
+
+def save_run(state_dir, entries):
+    """
+    Writes entries or duplicate filter digests added since previous
+    checkpoint to new run file of checkpoint, so that each checkpoint only
+    adds new data. Run file is flushed to disk before it is recorded in
+    checkpoint.
+
+    Args:
+        state_dir (string): path to checkpoint directory.
+        entries (list): contains tuples of drug name (string), prescriber
+            name (tuple of strings), and drug cost (float) of each entry, or
+            digests (bytes) of exact duplicate entry filter.
+
+    Returns:
+        run_path (string): path to run file of checkpoint.
+    """
+    # Creates checkpoint directory if required
+    os.makedirs(state_dir, exist_ok=True)
+    # Creates new run file in checkpoint directory
+    run_handle, run_path = tempfile.mkstemp(
+        prefix=run_prefix, suffix=".pkl", dir=state_dir,
+    )
+    # Safely opens and closes run file for writing
+    with open(run_handle, 'wb') as run_file:
+        # Writes entries
+        pickle.dump(entries, run_file, protocol=pickle.HIGHEST_PROTOCOL)
+        # Flushes run file to disk
+        run_file.flush()
+        os.fsync(run_file.fileno())
+    # Returns path to run file
+    return run_path
+
+def load_run(run_path):
+    """
+    Reads entries from run file of checkpoint.
+
+    Args:
+        run_path (string): path to run file of checkpoint.
+
+    Returns:
+        (list of tuples): contains drug name, prescriber name, and drug cost
+            of each entry.
+    """
+    # Safely opens and closes run file for reading
+    with open(run_path, 'rb') as run_file:
+        # Returns entries
+        return pickle.load(run_file)
+
+def load_checkpoint(state_dir, key):
+    """
+    Reads latest valid checkpoint from checkpoint directory. Checkpoint is
+    valid if it can be read, matches checkpoint version and key, and all its
+    run files exist. If latest checkpoint is not valid, previous checkpoint
+    is tried. Note checkpoints are read using the pickle module and must only
+    be loaded from trusted directories.
+
+    Args:
+        state_dir (string): path to checkpoint directory.
+        key (dictionary): identifies input file and import settings.
+
+    Returns:
+        state (dictionary or None): contains import state and byte offset. If
+            None, no valid checkpoint is found.
+    """
+    # Iterates over latest and previous checkpoints
+    for name in checkpoint_names:
+        # Sets path to checkpoint
+        path = os.path.join(state_dir, name)
+        # If checkpoint cannot be read, tries next checkpoint
+        try:
+            # Safely opens and closes checkpoint for reading
+            with open(path, 'rb') as checkpoint_file:
+                # Reads checkpoint
+                checkpoint = pickle.load(checkpoint_file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # Tries next checkpoint
+            continue
+        # If True, checkpoint belongs to other version, file, or settings
+        if not isinstance(checkpoint, dict) or \
+                checkpoint.get("version") != checkpoint_version or \
+                checkpoint.get("key") != key:
+            # Tries next checkpoint
+            continue
+        # Sets import state
+        state = checkpoint["state"]
+        # If True, run files of checkpoint are missing
+        if not all(
+            os.path.isfile(run)
+            for run in state["spill_runs"] + state["state_runs"] +
+            state["dedup_runs"]
+        ):
+            # Tries next checkpoint
+            continue
+        # Returns import state
+        return state
+    # Returns empty state if no valid checkpoint is found
+    return None
+
+def clear_checkpoints(state_dir):
+    """
+    Removes all checkpoints and their run files from checkpoint directory
+    after completed run. Also removes temporary checkpoints and spilled run
+    files left by interrupted runs.
+
+    Args:
+        state_dir (string): path to checkpoint directory.
+
+    Returns:
+        None.
+    """
+    # Iterates over latest and previous checkpoints
+    for name in checkpoint_names:
+        # Sets path to checkpoint
+        path = os.path.join(state_dir, name)
+        # If True, checkpoint exists
+        if os.path.isfile(path):
+            # Removes checkpoint
+            os.remove(path)
+    # If True, checkpoint directory exists and may hold run files
+    if os.path.isdir(state_dir):
+        # Iterates over all files in checkpoint directory
+        for name in os.listdir(state_dir):
+            # If True, file is run file of checkpoint, temporary
+            # checkpoint, or spilled run file
+            if any(name.startswith(prefix) and name.endswith(suffix)
+                    for prefix, suffix in stale_files + [(run_prefix, ".pkl")]):
+                # Removes file
+                os.remove(os.path.join(state_dir, name))
+    # Completes removal
+    return None
+
+
+## MODULE METADATA
+
+__author__ = 'Arthur D. Dysart'
+__copyright__ = 'Copyright 2018, Pharmacopedia.Py'
+__credits__ = ['Arthur D. Dysart']
+__license__ = 'MIT License'
+__version__ = '1.0.0'
+__maintainer__ = 'Arthur D. Dysart'
+__email__ = 'hi@arthurdys.art'
+__status__ = 'closed'
+
+
+## END OF MODULE
\ No newline at end of file
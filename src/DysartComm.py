@@ -47,15 +47,30 @@ SOFTWARE.
 
 # Checks file existence in input and export paths
 import os
+# Displays messages in standard error stream
+import sys
 # Enables display of warnings in terminal
 import warnings as wn
 
 
+## MODULE SETTINGS
+
+# Sets path which stands for standard input or standard output
+stream_path = "-"
+# Sets flags which require input file, and flags which require output file;
+# these flags are not available with standard input or standard output
+file_input_options = [
+    "state_dir", "resume", "sample", "diff", "snapshot", "cache",
+]
+file_output_options = ["cache"]
+
+
 ## PRIMARY FUNCTIONS
 
 def check_paths(import_path, export_path):
     """
-    Inspects for file errors in import and export paths.
+    Inspects for file errors in import and export paths. Path "-" stands for
+    standard input or standard output, and is not inspected.
 
     Args:
         import_path (string): path to input file.
@@ -69,14 +84,14 @@ def check_paths(import_path, export_path):
         FileExistsError: file exists on output path.
     """
     # If input file cannot be found, raises file error
-    if not os.path.isfile(import_path):
+    if import_path != stream_path and not os.path.isfile(import_path):
         # Raises error for non-existent input file
         raise FileNotFoundError(
             "File not found in \"input\" directory.\n"
             "Please confirm and run again."
         )
     # If output file already exists, raises file error
-    if os.path.isfile(export_path):
+    if export_path != stream_path and os.path.isfile(export_path):
         # Raises error for existing output file
         raise FileExistsError(
             "File already exists in \"output\" directory."
@@ -85,6 +100,41 @@ def check_paths(import_path, export_path):
     # Completes quality check for import path and export path
     return None
 
+def check_streams(import_path, export_path, options):
+    """
+    Inspects for flags which are not available with standard input or
+    standard output, such as checkpoints and caches, which require files.
+
+    Args:
+        import_path (string): path to input file.
+        export_path (string): path to output file.
+        options (dictionary): contains flag values with flag name as key.
+
+    Returns:
+        None.
+
+    Raises:
+        ValueError: flag requires input or output file.
+    """
+    # Sets flags which are not available with specified streams
+    all_names = (
+        (file_input_options if import_path == stream_path else [])
+        + (file_output_options if export_path == stream_path else [])
+    )
+    # Iterates over all flags which are not available
+    for name in all_names:
+        # If True, flag requires file and is specified
+        if name in options:
+            # Raises error for flag which requires file
+            raise ValueError(
+                "Option \"--{}\" is not available with standard input or "
+                "output (\"{}\").\nCheck then run again.".format(
+                    name.replace("_", "-"), stream_path
+                )
+            )
+    # Completes stream check
+    return None
+
 def parse_warn(*args, **kwargs):
     """
     Reports unsafe data entries to user via terminal.
@@ -169,14 +219,14 @@ def parse_error(parsed_line, **kwargs):
     # If parsed entry does not have 5 elements, raises index error
     if len(parsed_line) != 5:
         # Raises error for more than 5 entry elements
-        print(parsed_line)
+        print(parsed_line, file=sys.stderr)
         raise IndexError(
             "Entry with ID {} split incorrectly with {} elements."
             "\nCheck then run again.".format(parsed_line[0], len(parsed_line))
         )
     # If prescriber ID has alphabetic characters, raises type error
     if not numbers_only(parsed_line[0], safe_char):
-        print(parsed_line)
+        print(parsed_line, file=sys.stderr)
         #  Raises error that prescriber ID has alphabetic characters
         raise TypeError(
             "Entry with ID {} has prescriber ID which contains alphabetical "
@@ -184,7 +234,7 @@ def parse_error(parsed_line, **kwargs):
         )
     # If prescriber last name has numeric characters, raises type error
     if not alpha_only(parsed_line[1], safe_char):
-        print(parsed_line)
+        print(parsed_line, file=sys.stderr)
         #  Raises error that prescriber last name has numeric characters
         raise TypeError(
             "Entry with ID {} has prescriber last name \"{}\" which contains "
@@ -193,7 +243,7 @@ def parse_error(parsed_line, **kwargs):
         )
     # If prescriber first name has numeric characters, raises type errror
     if not alpha_only(parsed_line[2], safe_char):
-        print(parsed_line)
+        print(parsed_line, file=sys.stderr)
         # Raises error that prescriber first name has numeric characters
         raise TypeError(
             "Entry with ID {} has prescriber first name \"{}\" which contains "
@@ -202,7 +252,7 @@ def parse_error(parsed_line, **kwargs):
         )
     # If drug cost has alphabetic characters, raises type error
     if not numbers_only(parsed_line[4], safe_char):
-        print(parsed_line)
+        print(parsed_line, file=sys.stderr)
         # Raises error that drug cost has alphabetic characters
         raise TypeError(
             "Entry with ID {} has cost \"{}\" which contains non-numeric "
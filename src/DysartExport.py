@@ -43,11 +43,55 @@ SOFTWARE.
 """
 
 
+## REQUIRED MODULES
+
+# Writes to standard output without closing it
+import contextlib
+# Redirects standard output after closed pipe
+import os
+# Retrieves standard output
+import sys
+
+
+## REQUIRED LIBRARIES
+
+# Retrieves path which stands for standard output
+# Source: (home)/src/DysartComm.py
+import DysartComm as adc
+
+
+## MODULE SETTINGS
+
+# Sets size in bytes of write buffer of output file
+export_buffer_size = 1024 ** 2
+
+# Sets names of statistics columns of prescriber net costs
+stats_columns = [
+    "min_cost", "max_cost", "mean_cost", "median_cost", "p95_cost",
+]
+
+# Sets names of comparison columns
+diff_columns = [
+    "drug_name", "status", "old_rank", "new_rank", "rank_change",
+    "old_num_prescriber", "new_num_prescriber", "num_prescriber_change",
+    "old_total_cost", "new_total_cost", "total_cost_change",
+]
+# Sets names of estimate columns of sampling preview
+estimate_columns = [
+    "drug_name", "est_num_prescriber", "num_prescriber_low",
+    "num_prescriber_high", "est_total_cost", "total_cost_low",
+    "total_cost_high",
+]
+
+
 ## PRIMARY FUNCTIONS
 
-def export_data(processed_data, all_drugs_sorted, export_path, cost_usd):
+def export_data(processed_data, all_drugs_sorted, export_path, cost_usd,
+        drug_stats=None):
     """
-    Formats and writes all entries to export file.
+    Formats and writes all entries to export file. If statistics dictionary
+    is specified, minimum, maximum, mean, median, and 95th percentile of
+    prescriber net costs are added as columns.
 
     Args:
         processed_data (dictionary): contains all analyzed data. Primary key
@@ -57,14 +101,26 @@ def export_data(processed_data, all_drugs_sorted, export_path, cost_usd):
         all_drugs_sorted (list of strings): contains all drug names in
             sequential list sorted by drug cost and alphanumeric name.
         export_path (string): path to output file.
+        cost_usd (boolean): if True, costs are displayed in dollars only.
+        drug_stats (dictionary or None): contains cost sketch (CostSketch)
+            with drug name (string) as key. If None, statistics columns are
+            not exported.
 
     Returns:
         None.
     """
-    # Safely opens and closes file for writing
-    with open(export_path, 'w') as target_file:
+    # Sets cost format in dollars only, or in dollars and cents
+    cost_format = "{:.0f}" if cost_usd else "{:.2f}"
+    # Safely opens and closes file, or standard output, for writing
+    with open_export(export_path) as target_file:
         # Creates header for output file
-        target_file.write("drug_name,num_prescriber,total_cost\n")
+        target_file.write("drug_name,num_prescriber,total_cost")
+        # If True, adds statistics columns to header
+        if drug_stats is not None:
+            # Adds statistics column names
+            target_file.write("," + ",".join(stats_columns))
+        # Ends header
+        target_file.write("\n")
         # Iterates over whole drug name list
         for drug in all_drugs_sorted:
             # Sets number of prescribers
@@ -79,6 +135,12 @@ def export_data(processed_data, all_drugs_sorted, export_path, cost_usd):
                 total_cost = "{:.2f}".format(processed_data[drug][1])
             # Creates final export string for given drug
             export_text = ",".join([drug,num_prescriber,total_cost])
+            # If True, adds distribution statistics of prescriber costs
+            if drug_stats is not None:
+                # Adds formatted statistics
+                export_text = ",".join([export_text] + [
+                    cost_format.format(x) for x in drug_stats[drug].summary()
+                ])
             #If not the last drug, add line break
             if drug != all_drugs_sorted[-1]:
                 # Adds line break to final export string
@@ -88,6 +150,173 @@ def export_data(processed_data, all_drugs_sorted, export_path, cost_usd):
     # Completes analyzed data export during file writing
     return None
 
+def export_diff(diff_rows, export_path, cost_usd):
+    """
+    Formats and writes comparison of two runs to export file. Changes are
+    current minus previous values; rank change is previous minus current
+    rank, so that positive values indicate drugs moving up. Values of missing
+    run are left empty.
+
+    Args:
+        diff_rows (list of tuples): contains compared drugs from
+            diff_data() function.
+        export_path (string): path to output file.
+        cost_usd (boolean): if True, costs are displayed in dollars only.
+
+    Returns:
+        None.
+    """
+    # Sets cost format in dollars only, or in dollars and cents
+    cost_format = "{:.0f}" if cost_usd else "{:.2f}"
+
+    def difference(old, new, value_format):
+        """
+        Formats difference of two values, or empty string if either value
+        is missing. Required by export_diff() outer function.
+        """
+        # Returns formatted difference
+        return "" if old is None or new is None else value_format.format(new - old)
+
+    def value(x, value_format):
+        """
+        Formats value, or empty string if value is missing. Required by
+        export_diff() outer function.
+        """
+        # Returns formatted value
+        return "" if x is None else value_format.format(x)
+
+    # Sets empty collection of export strings
+    all_lines = [",".join(diff_columns)]
+    # Iterates over all compared drugs
+    for row in diff_rows:
+        # Sets drug, status, ranks, prescriber counts, and total costs
+        drug, status, old_rank, new_rank, old_num, new_num, old_cost, new_cost = row
+        # Creates final export string for given drug
+        all_lines.append(",".join([
+            drug, status,
+            value(old_rank, "{}"), value(new_rank, "{}"),
+            difference(new_rank, old_rank, "{:+d}"),
+            value(old_num, "{}"), value(new_num, "{}"),
+            difference(old_num, new_num, "{:+d}"),
+            value(old_cost, cost_format), value(new_cost, cost_format),
+            difference(old_cost, new_cost, "{:+" + cost_format[2:]),
+        ]))
+    # Safely opens and closes file, or standard output, for writing
+    with open_export(export_path) as target_file:
+        # Writes all export strings without final line break, as in
+        # export_data() function
+        target_file.write("\n".join(all_lines))
+    # Completes comparison export
+    return None
+
+def export_estimate(processed_data, margins, all_drugs_sorted, export_path,
+        cost_usd, summary):
+    """
+    Formats and writes estimates of sampling preview to export file. First
+    line marks file as estimate and states sampled fraction and confidence
+    level; estimate columns are named accordingly. Lower limits of
+    confidence intervals are not below zero.
+
+    Args:
+        processed_data (dictionary): contains estimated data from
+            estimate_data() function.
+        margins (dictionary): contains confidence interval margins from
+            estimate_data() function.
+        all_drugs_sorted (list of strings): contains all drug names in
+            sequential list sorted by estimated cost and alphanumeric name.
+        export_path (string): path to output file.
+        cost_usd (boolean): if True, costs are displayed in dollars only.
+        summary (dictionary): contains total and sampled number of blocks and
+            confidence level.
+
+    Returns:
+        None.
+    """
+    # Sets cost format in dollars only, or in dollars and cents
+    cost_format = "{:.0f}" if cost_usd else "{:.2f}"
+    # Sets total and sampled number of blocks
+    num_blocks = summary.get("sample_blocks", 0)
+    num_sampled = summary.get("sampled_blocks", 0)
+    # Sets estimate notice and header
+    all_lines = [
+        "# ESTIMATE: sampled {} of {} blocks ({:.1%} of input); intervals at "
+        "{:.0%} confidence".format(
+            num_sampled, num_blocks, num_sampled / max(num_blocks, 1),
+            summary.get("confidence", 0),
+        ),
+        ",".join(estimate_columns),
+    ]
+    # Iterates over whole drug name list
+    for drug in all_drugs_sorted:
+        # Sets estimated prescriber count and total cost with margins
+        num_prescriber, total_cost = processed_data[drug]
+        num_margin, cost_margin = margins[drug]
+        # Creates final export string for given drug
+        all_lines.append(",".join([
+            drug,
+            "{}".format(num_prescriber),
+            "{:.0f}".format(max(num_prescriber - num_margin, 0)),
+            "{:.0f}".format(num_prescriber + num_margin),
+            cost_format.format(total_cost),
+            cost_format.format(max(total_cost - cost_margin, 0)),
+            cost_format.format(total_cost + cost_margin),
+        ]))
+    # Safely opens and closes file, or standard output, for writing
+    with open_export(export_path) as target_file:
+        # Writes all export strings without final line break, as in
+        # export_data() function
+        target_file.write("\n".join(all_lines))
+    # Completes estimate export
+    return None
+
+
+## SECONDARY FUNCTIONS
+
+def open_export(export_path):
+    """
+    Opens output file for buffered writing. Path "-" stands for standard
+    output, which is flushed but not closed after export. Required by all
+    export functions.
+
+    Args:
+        export_path (string): path to output file.
+
+    Returns:
+        (context manager): output file opened for writing.
+    """
+    # If True, writes to standard output
+    if export_path == adc.stream_path:
+        # Returns standard output, which is flushed after export
+        return flush_stdout()
+    # Returns output file with write buffer
+    return open(export_path, 'w', buffering=export_buffer_size)
+
+@contextlib.contextmanager
+def flush_stdout():
+    """
+    Provides standard output for writing, and flushes it after writing. If
+    reader of pipe exits early (e.g., "| head"), standard output is pointed
+    at null device and script ends quietly. Required by open_export()
+    function.
+
+    Yields:
+        (file): standard output.
+    """
+    # Safely writes to standard output
+    try:
+        # Provides standard output
+        yield sys.stdout
+        # Writes buffered output
+        sys.stdout.flush()
+    # If True, reader of pipe exited early
+    except BrokenPipeError:
+        # Points standard output at null device, so that buffered output
+        # is discarded at exit
+        null_handle = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(null_handle, sys.stdout.fileno())
+        # Ends script quietly
+        sys.exit(0)
+
 
 ## MODULE METADATA
 
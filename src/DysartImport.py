@@ -42,15 +42,162 @@ SOFTWARE.
 """
 
 
+## REQUIRED MODULES
+
+# Collects specified columns from split data entries
+import operator
+# Reads standard input without closing it
+import contextlib
+# Hashes data entries for duplicate entry filter
+import hashlib
+# Writes run records to disk
+import json
+# Joins data entries read with first data entry to remaining blocks
+import itertools
+# Sets size of duplicate entry filter
+import math
+# Checks file existence of drug list
+import os
+# Chooses blocks of sampling preview
+import random
+# Estimates memory size of import data
+import sys
+# Creates run files in spill directory
+import tempfile
+# Schedules checkpoints during import
+import time
+
+# Retrieves interpreter memory use; not available on all operating systems
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
 ## REQUIRED LIBRARIES
 
 # Enables warning and error communication via terminal
 # Source: (home)/src/DysartComm.py
 import DysartComm as adc
+# Saves import state to checkpoint directory
+# Source: (home)/src/DysartCheckpoint.py
+import DysartCheckpoint as adk
+
+
+## MODULE SETTINGS
+
+# Sets default column layout for files without header
+default_columns = [
+    "id", "prescriber_last_name", "prescriber_first_name",
+    "drug_name", "drug_cost",
+]
+# Sets columns required for analysis, in decoding order
+import_columns = [
+    "drug_name", "prescriber_last_name", "prescriber_first_name", "drug_cost",
+]
+# Sets estimated memory size in bytes of new drug (with sub-dictionary), new
+# prescriber (with name tuple and cost list), and new drug cost
+drug_entry_size = 240
+prescriber_entry_size = 200
+cost_entry_size = 32
+# Sets fraction of memory budget used for import data; remainder is reserved
+# as safety margin for memory size estimation
+budget_fraction = 0.75
+# Sets memory in bytes reserved within memory budget for reading blocks, for
+# growth of import data between checks of resident memory, and for merging
+# run files
+memory_reserve = 2 * 1024 ** 2
+# Sets number of imported data entries between checks of resident memory
+memory_check_interval = 1024
+# Sets minimum memory budget in bytes for import data after budget is
+# lowered, so that memory kept outside of import data, such as duplicate
+# entry filters, does not cause very small run files
+min_run_size = 1024 ** 2
+# Sets size in bytes of blocks read with memory budget, so that decoded
+# blocks fit within reserved memory
+budget_block_size = 64 * 1024
+# Sets size in bytes of newline-aligned blocks read during import, and
+# character encoding of input file
+block_size = 1024 ** 2
+import_encoding = "utf-8"
+# Sets default minimum time in seconds between checkpoints
+checkpoint_interval = 60.0
+# Sets default false-positive rate of duplicate entry filter, and minimum
+# expected size in bytes of data entry used to estimate number of entries
+dedup_fpr = 0.001
+dedup_line_size = 40
+# Sets assumed input size in bytes used to estimate number of entries for
+# standard input, whose size is unknown
+dedup_stream_size = 256 * 1024 ** 2
+# Sets size in bytes of newline-aligned blocks read in sampling preview, and
+# minimum number of sampled blocks required to estimate sampling error
+sample_block_size = 64 * 1024
+sample_min_blocks = 2
+# Sets maximum number of raw drug names kept in memo of canonical drug
+# names, and display policies of canonical drug names
+canonical_memo_size = 65536
+canonical_policies = ["first", "common", "key"]
+# Sets standard column names for known column names of other CMS layouts
+column_aliases = {
+    "npi": "id",
+    "prscrbr_npi": "id",
+    "nppes_provider_last_org_name": "prescriber_last_name",
+    "prscrbr_last_org_name": "prescriber_last_name",
+    "nppes_provider_first_name": "prescriber_first_name",
+    "prscrbr_first_name": "prescriber_first_name",
+    "brnd_name": "drug_name",
+    "total_drug_cost": "drug_cost",
+    "tot_drug_cst": "drug_cost",
+}
 
 
 ## PRIMARY FUNCTIONS
 
+def get_options(terminal_args, valid_options):
+    """
+    Separates optional flags from positional terminal arguments. Optional
+    flags are specified as "--name=value" or "--name"; dashes in flag names
+    are interpreted as underscores. Flags without value are set as True.
+
+    Args:
+        terminal_args (list of strings): List of terminal arguments.
+        valid_options (list of strings): contains all recognized flag names.
+
+    Returns:
+        positional_args (list of strings): terminal arguments without flags.
+        options (dictionary): contains flag values (string or boolean) with
+            flag name (string) as key.
+
+    Raises:
+        KeyError: flag name is unknown.
+    """
+    # Sets empty collections for positional arguments and flags
+    positional_args = []
+    options = {}
+    # Iterates over all terminal arguments
+    for arg in terminal_args:
+        # If True, argument is positional
+        if not arg.startswith("--"):
+            # Saves positional argument in original order
+            positional_args.append(arg)
+            # Continues to next argument
+            continue
+        # Splits flag into name and value
+        name, equals_sign, value = arg[2:].partition("=")
+        # Sets flag name with underscores
+        name = name.replace("-", "_")
+        # If flag name is not recognized, raises key error
+        if name not in valid_options:
+            # Raises error for unknown flag
+            raise KeyError(
+                "Unknown option \"--{}\". See instructions in \"Read Me\" "
+                "then run again.".format(name.replace("_", "-"))
+            )
+        # Sets flag value; flags without value are switched on
+        options[name] = value if equals_sign else True
+    # Returns positional arguments and flags to script
+    return positional_args, options
+
 def get_args(terminal_args):
     """
     Interprets terminal arguments as import path, export path, and sorting
@@ -73,7 +220,8 @@ def get_args(terminal_args):
     # Prints number of arguments to terminal
     print(
         "{} arguments identified.\nDrugs are sorted "
-        "by total cost.".format(num_args)
+        "by total cost.".format(num_args),
+        file=sys.stderr,
     )
     # If three arguments, sets import and export paths
     if num_args == 2:
@@ -86,7 +234,8 @@ def get_args(terminal_args):
         # Prints secondary sorting method to terminal
         print(
             "If necessary, drugs names are sorted "
-            "according to alphanumeric and special characters.\n"
+            "according to alphanumeric and special characters.\n",
+            file=sys.stderr,
         )
     # If four arguments, sets import path, export path, and secondary sorting
     # method
@@ -103,7 +252,8 @@ def get_args(terminal_args):
             # Prints secondary sorting method to terminal
             print(
                 "If necessary, drugs names are sorted "
-                "according to alphanumeric characters only.\n"
+                "according to alphanumeric characters only.\n",
+                file=sys.stderr,
             )
         # Else, sets secondary sorting method to consider both alphanumeric
         # and special characters
@@ -113,7 +263,8 @@ def get_args(terminal_args):
             # Prints secondary sorting method to terminal
             print(
                 "If necessary, drugs names are sorted "
-                "according to alphanumeric and special characters.\n"
+                "according to alphanumeric and special characters.\n",
+                file=sys.stderr,
             )
     # If not three or four arguments, raises index error
     else:
@@ -123,77 +274,1202 @@ def get_args(terminal_args):
             "instructions in \"Read Me\" then run again."
         )
     # Prints input path to terminal
-    print("\nImport file:\t{}\n".format(import_path))
+    print("\nImport file:\t{}\n".format(import_path), file=sys.stderr)
     # Checks integrity of input and export paths
     adc.check_paths(import_path, export_path)
     # Returns import path, export path, and sorting method to terminal
     return import_path, export_path, alpha_sort
 
+def set_drug_filter(options, canonical=None):
+    """
+    Creates drug name filter from terminal flags. Drug list ("drugs" flag) is
+    given as semicolon-separated drug names or as path to text file with one
+    drug name per line. Name prefix is given by "prefix" flag. Matching is
+    case-insensitive and ignores enclosing double-quotation marks. If
+    canonicalizer is specified, drug list, prefix, and drug names are
+    compared as canonical drug names, so that all variants of listed drugs
+    are imported.
+
+    Args:
+        options (dictionary): contains flag values with flag name as key.
+        canonical (DrugCanonicalizer or None): sets canonical drug names. If
+            None, drug names are compared as spelled.
+
+    Returns:
+        drug_filter (function or None): returns True if drug name (string)
+            passes filter. If None, no drug name filter is specified.
+
+    Raises:
+        ValueError: drug list or prefix flag has no value.
+    """
+    # Iterates over drug list and name prefix flags
+    for name in ["drugs", "prefix"]:
+        # Sets flag value
+        value = options.get(name)
+        # If flag is given without value, raises value error
+        if value is not None and (
+                not isinstance(value, str) or not value.strip().strip("\"")):
+            # Raises error for missing flag value
+            raise ValueError(
+                "Option \"--{}\" requires value.\nCheck then run "
+                "again.".format(name)
+            )
+    # Sets drug list and name prefix from terminal flags
+    drug_list = options.get("drugs")
+    prefix = options.get("prefix")
+    # If neither flag is specified, no filter is required
+    if not isinstance(drug_list, str) and not isinstance(prefix, str):
+        # Returns empty filter
+        return None
+    # If True, drug list is read from text file
+    if isinstance(drug_list, str) and os.path.isfile(drug_list):
+        # Safely opens and closes drug list file for reading
+        with open(drug_list, 'r') as list_file:
+            # Collects uppercase drug names from non-empty lines
+            drug_set = {
+                name.strip().strip("\"").upper()
+                for name in list_file if name.strip()
+            }
+    # If True, drug list is given as semicolon-separated names
+    elif isinstance(drug_list, str):
+        # Collects uppercase drug names from semicolon-separated flag value
+        drug_set = {
+            name.strip().strip("\"").upper()
+            for name in drug_list.split(";") if name.strip()
+        }
+    # Else, any drug name is accepted by drug list
+    else:
+        # Sets drug list as empty
+        drug_set = None
+    # Sets uppercase prefix without enclosing quotation marks; empty prefix
+    # matches all drugs
+    prefix = prefix.strip("\"").upper() if isinstance(prefix, str) else ""
+    # If True, sets canonical drug list and prefix
+    if canonical is not None:
+        # Sets canonical drug names of drug list
+        if drug_set is not None:
+            drug_set = {canonical.normalize(name) for name in drug_set}
+        # Sets canonical prefix
+        prefix = canonical.normalize(prefix) if prefix else prefix
+
+    def drug_filter(drug_name):
+        """
+        Determines whether drug name passes drug list and name prefix. Used
+        by import_data() function.
+
+        Args:
+            drug_name (string): drug name as parsed from data entry.
+
+        Returns:
+            (boolean): if True, data entry is imported.
+        """
+        # If True, sets canonical drug name
+        if canonical is not None:
+            name = canonical.get_key(drug_name)
+        # Else, sets uppercase drug name without enclosing quotation marks
+        else:
+            name = drug_name.strip("\"").upper()
+        # If drug list is specified and drug is not listed, rejects drug
+        if drug_set is not None and name not in drug_set:
+            # Rejects drug name
+            return False
+        # Accepts drug name if it starts with prefix
+        return name.startswith(prefix)
+
+    # Returns drug name filter
+    return drug_filter
+
+def set_cost_range(options):
+    """
+    Interprets minimum and maximum total drug cost from terminal flags.
+
+    Args:
+        options (dictionary): contains flag values with flag name as key.
+
+    Returns:
+        min_cost (float or None): minimum total cost for reported drugs.
+        max_cost (float or None): maximum total cost for reported drugs.
+
+    Raises:
+        ValueError: cost limit is not a number.
+    """
+    # Sets empty cost limits
+    cost_range = []
+    # Iterates over minimum and maximum cost flags
+    for name in ["min_cost", "max_cost"]:
+        # Sets flag value
+        value = options.get(name)
+        # If flag is not specified, cost is not limited
+        if value is None:
+            # Saves empty cost limit
+            cost_range.append(None)
+            # Continues to next flag
+            continue
+        # If flag value is not a number, raises value error
+        try:
+            # Saves cost limit
+            cost_range.append(float(value))
+        except (TypeError, ValueError):
+            # Raises error for non-numeric cost limit
+            raise ValueError(
+                "Option \"--{}\" requires numeric value.\nCheck then run "
+                "again.".format(name.replace("_", "-"))
+            )
+    # Returns minimum and maximum cost to script
+    return cost_range[0], cost_range[1]
+
 def import_data(import_path, warn=False, **kwargs):
     """
-    Collects, parses, and organizes data from imported file. For each data
-    entry or line, removes new line character and splits raw string according
-    to comma delimiter. If "prescriber_last_name" is index 1 element, entry
-    is identified as header row and skipped. Parsed entries are checked for
-    unsafe characters using the parse_line_custom() function. Parsed data
-    entries are assigned aliases. Import data is stored in nested dictionary.
-    Prescriber first and last name are stored as tuple and implemented as
-    dictionary key for corresponding drug cost. Primary key is drug name,
-    secondary key is prescriber name. See "Read Me" for more information.
+    Collects, parses, and organizes data from imported file. Column layout is
+    detected from the first data entry using the get_schema() function, and
+    only columns required for analysis are decoded using the set_decoder()
+    function. Decoded entries are checked for unsafe characters. Import data
+    is stored in nested dictionary. Prescriber first and last name are stored
+    as tuple and implemented as dictionary key for corresponding drug cost.
+    Primary key is drug name, secondary key is prescriber name. See "Read Me"
+    for more information. If drug filter is specified, drug name of entries
+    without double-quotation marks is decoded alone before full decoding, so
+    that rejected entries are not parsed. If duplicate entry filter is
+    specified, entries identical to earlier entries are dropped and counted
+    in run summary. Repeated file headers, as found in
+    concatenated files, are identified only when drug cost is not a number.
+    File is read in newline-aligned blocks using the read_blocks() function,
+    without moving back in file, so that standard input ("-" path) can be
+    streamed.
+    If checkpoint directory is specified, import state and byte offset are
+    periodically saved after completed blocks. Checkpoints are incremental:
+    entries imported since the previous checkpoint are written to run file
+    of checkpoint, and import data held with memory budget is spilled, so
+    that each checkpoint only records paths to run files. On resume, entries
+    of run files of checkpoint are imported again into memory. If sampling
+    fraction is specified, only random blocks are read using the
+    read_sample() function,
+    and import data of each block is collected separately. If canonicalizer
+    is specified, drug names are replaced by canonical drug names after
+    warnings are checked, so that variants are merged.
 
     Args:
         import_path (string): path to input file.
         warn (boolean): if True, displays data entries with unsafe characters
             to the user terminal as warning.
         char (list of strings): contains all string characters considered safe.
+        drug_filter (function or None): returns True if drug name passes
+            filter. If None, all drugs are imported.
+        budget (integer or None): memory budget for import data in bytes. If
+            exceeded, import data is written to sorted run file on disk using
+            the spill_data() function. If None, import data is not limited.
+        memory_limit (integer or None): limit of resident memory in bytes,
+            checked periodically with the get_rss() function. If exceeded,
+            memory budget is lowered to estimated size of import data, but
+            not below "min_run_size" setting or initial budget. If None,
+            only estimated size is checked.
+        spill_dir (string): path to directory for run files. If checkpoint
+            directory is set, run files are written there instead.
+        spill_runs (list of strings): collects paths to run files. Run files
+            are removed if import fails without checkpoint directory.
+        state_dir (string or None): path to checkpoint directory. If None,
+            checkpoints are not saved.
+        interval (float): minimum time between checkpoints in seconds.
+        key (dictionary): identifies input file and import settings.
+        resume_state (dictionary or None): import state restored from
+            checkpoint. If None, import starts at beginning of file.
+        dedup (ExactFilter, BloomFilter, or None): identifies repeated data
+            entries, which are not imported. If None, all entries are
+            imported.
+        summary (dictionary): collects run summary, such as number of
+            dropped duplicate entries (integer, key "duplicates"), which is
+            only counted if duplicate entry filter is specified.
+        sample (float or None): fraction of input file read in sampling
+            preview. If None, whole file is imported.
+        seed (integer): seed of random choice of sampled blocks.
+        sample_data (list of dictionaries): collects import data of each
+            sampled block separately, which is required to estimate sampling
+            error.
+        canonical (DrugCanonicalizer or None): merges variants of drug names
+            under canonical drug name. If None, drug names are imported as
+            spelled.
 
     Returns:
         all_data (nested dictionary): contains all collected, parsed, and
             organized data. Primary key is drug name (string), and primary
             value is sub-dictionary of prescribers (tuple of strings).
             Secondary key is prescriber name (string) and secondary value is
-            drug cost (list of floats).
+            drug cost (list of floats). Empty if import data was written to
+            run files, which are collected by merge_runs() function.
+
+    Raises:
+        ValueError: drug cost is not a number.
     """
     # Sets empty dictionary for import data
     all_data = {}
-    # Safely opens and closes file for reading
-    with open(import_path, 'r') as target_file:
-        # Iterates over all data entries or lines
-        for line in target_file:
-            # If True, data entry is empty line
-            if line.count(',') < 1:
-                # Skips import of empty lines
-                continue
-            # Parses line intelligently to account for non-active commas
-            parsed_line = parse_line_custom(line)
-            # If True, data entry is file header
-            if "prescriber_last_name" in parsed_line[1].lower():
-                # Skips import of file header
-                continue
-            # If True, prints data entries with unsafe characters to terminal
-            if warn:
-                # Warns for data entries with unsafe characters 
-                adc.parse_warn(*parsed_line, line=line, ch=kwargs['ch'])
-            # Sets prescriber id (index 0), last name (1), and first name (2)
-            prescriber_id, last_name, first_name = parsed_line[:3]
-            # Sets drug name (index 3) and drug cost (4)
-            drug_name, drug_cost = parsed_line[-2:]
-            # Sets tuple of prescriber full name
-            prescriber_name = (last_name, first_name)
-            # If drug does not exist in dictionary, adds new drug name
-            if drug_name not in all_data:
-                # For each new drug, creates initial prescriber sub-dictionary
-                 all_data[drug_name] = {}
-            # If prescriber is not assigned to drug, adds known prescriber
-            if prescriber_name not in all_data[drug_name]:
-                # For each new prescriber, creates initial cost list
-                all_data[drug_name][prescriber_name] = []
-            # Adds cost to drug's known prescribers
-            all_data[drug_name][prescriber_name].append(float(drug_cost))
+    # Sets drug name filter
+    drug_filter = kwargs.get('drug_filter')
+    # Sets memory budget for import data, spill directory, and run files
+    budget = kwargs.get('budget')
+    memory_limit = kwargs.get('memory_limit')
+    spill_dir = kwargs.get('spill_dir')
+    spill_runs = kwargs.get('spill_runs')
+    # Sets estimated memory size of import data, number of entries until
+    # next check of resident memory, and resident memory kept after spill
+    data_size = 0
+    next_check = memory_check_interval
+    rss_mark = 0
+    # Sets lowest memory budget after budget is lowered, which is minimum
+    # run size unless initial budget is smaller
+    budget_floor = min(budget or 0, min_run_size)
+    # Sets checkpoint directory, interval, and key
+    state_dir = kwargs.get('state_dir')
+    interval = kwargs.get('interval')
+    key = kwargs.get('key')
+    # If True, writes run files to checkpoint directory and flushes them to
+    # disk, so that run files referred to by checkpoints persist
+    sync = bool(state_dir)
+    if sync:
+        # Creates checkpoint directory if required
+        os.makedirs(state_dir, exist_ok=True)
+        spill_dir = state_dir
+    # Sets import state restored from checkpoint
+    resume_state = kwargs.get('resume_state')
+    # Sets run files of checkpoints, which hold import data kept in memory,
+    # and entries imported since last checkpoint, which are only collected
+    # if import data is kept in memory
+    state_runs = []
+    delta = [] if state_dir and budget is None else None
+    # Sets run files of checkpoints which hold digests of exact duplicate
+    # entry filter
+    dedup_runs = []
+    # Sets duplicate entry filter and run summary
+    dedup = kwargs.get('dedup')
+    summary = kwargs.get('summary', {})
+    # If True, counts dropped duplicate entries in run summary
+    if dedup is not None:
+        summary.setdefault("duplicates", 0)
+    # Sets sampling fraction, seed, and collection of sampled import data
+    sample = kwargs.get('sample')
+    seed = kwargs.get('seed')
+    sample_data = kwargs.get('sample_data')
+    # Sets drug name canonicalizer
+    canonical = kwargs.get('canonical')
+    # Safely opens and closes file, or standard input, for reading. If import
+    # fails without checkpoint directory, removes run files
+    with open_import(import_path) as target_file, \
+            remove_runs_on_error(spill_runs, state_dir is None):
+        # Finds first data entry, skipping empty lines
+        first_lines, line_start, line_end = read_first_line(target_file)
+        # If True, file has no data entries
+        if first_lines is None:
+            # Returns empty dictionary
+            return all_data
+        # Determines column layout from first data entry
+        schema = get_schema(first_lines[0])
+        # Sets decoders for drug name alone and for all analyzed columns
+        decode_drug = set_decoder(schema, ["drug_name"])
+        decode_line = set_decoder(schema, import_columns)
+        # Sets data entries already read, and import start at first entry
+        pending, data_start = first_lines, line_start
+        # If True, first data entry is file header and is not imported
+        if schema["header"]:
+            # Sets import start after file header
+            pending, data_start = first_lines[1:], line_end
+        # If True, continues import from checkpoint
+        if resume_state is not None:
+            # Restores run files from checkpoint
+            spill_runs.extend(resume_state["spill_runs"])
+            state_runs.extend(resume_state["state_runs"])
+            # Iterates over run files of checkpoints
+            for path in state_runs:
+                # Iterates over drug, prescriber, and cost of all entries
+                for drug_name, prescriber_name, drug_cost in adk.load_run(path):
+                    # Adds cost to drug's prescriber in import data
+                    all_data.setdefault(drug_name, {}).setdefault(
+                        prescriber_name, []).append(drug_cost)
+            # Restores duplicate entry filter and run summary from checkpoint
+            dedup = resume_state["dedup"]
+            summary.update(resume_state["summary"])
+            # Restores digests of exact duplicate entry filter
+            dedup_runs.extend(resume_state["dedup_runs"])
+            for path in dedup_runs:
+                dedup.seen.update(adk.load_run(path))
+            # If True, restores spellings of canonical drug names
+            if canonical is not None:
+                # Sets recorded spellings from checkpoint
+                canonical.spellings = resume_state.get("canonical") or {}
+            # Sets import start at checkpoint byte offset
+            data_start = max(data_start, resume_state["offset"])
+        # Sets time of next checkpoint
+        next_checkpoint = time.monotonic() + interval if state_dir else None
+        # If True, collects digests of exact duplicate entry filter for
+        # checkpoints
+        if state_dir and isinstance(dedup, ExactFilter):
+            dedup.added = []
+        # Sets block size, which is smaller with memory budget
+        read_size = budget_block_size if budget is not None else block_size
+        # If True, reads random blocks of sampling preview
+        if sample is not None:
+            # Sets random newline-aligned blocks of data entries
+            all_blocks = read_sample(
+                target_file, data_start, sample, seed, summary
+            )
+        # If True, import resumes at checkpoint. Checkpoints are saved after
+        # data entries read with first data entry, which are not read again
+        elif resume_state is not None and resume_state["offset"] >= line_end:
+            # Moves to checkpoint byte offset
+            target_file.seek(data_start)
+            # Sets remaining newline-aligned blocks of data entries
+            all_blocks = read_blocks(target_file, data_start, read_size)
+        # Else, reads whole file
+        else:
+            # Sets data entries already read, then all remaining
+            # newline-aligned blocks of data entries
+            all_blocks = itertools.chain(
+                [(line_end, pending)],
+                read_blocks(target_file, line_end, read_size),
+            )
+        # Iterates over all newline-aligned blocks of data entries
+        for offset, all_lines in all_blocks:
+            # Iterates over all data entries or lines
+            for line in all_lines:
+                # If True, data entry is empty line
+                if line.count(',') < 1:
+                    # Skips import of empty lines
+                    continue
+                # If True, drug name is known without full parse
+                quoted = "\"" in line
+                # If True, checks drug name using cheap split before full parse
+                if drug_filter is not None and not quoted:
+                    # If drug name is rejected, skips import of data entry
+                    if not drug_filter(decode_drug(line)):
+                        # Skips import of filtered data entry
+                        continue
+                # Sets drug name, prescriber last name, first name, and cost
+                drug_name, last_name, first_name, drug_cost = decode_line(line)
+                # If True, checks drug name of entry with quoted elements
+                if drug_filter is not None and quoted:
+                    # If drug name is rejected, skips import of data entry
+                    if not drug_filter(drug_name):
+                        # Skips import of filtered data entry
+                        continue
+                # Converts drug cost to number
+                try:
+                    # Sets numeric drug cost
+                    drug_cost = float(drug_cost)
+                except ValueError:
+                    # If True, data entry is repeated file header
+                    if get_schema(line)["header"]:
+                        # Skips import of repeated file header
+                        continue
+                    # Raises error for non-numeric drug cost
+                    raise ValueError(
+                        "Entry has drug cost \"{}\" which is not a number.\n"
+                        "Check then run again.".format(drug_cost)
+                    )
+                # If True, checks whether data entry was already imported
+                if dedup is not None and dedup.check(line):
+                    # Counts dropped duplicate entry
+                    summary["duplicates"] += 1
+                    # Skips import of duplicate entry
+                    continue
+                # If True, prints data entries with unsafe characters
+                if warn:
+                    # Warns for data entries with unsafe characters
+                    adc.parse_warn(
+                        None, last_name, first_name, drug_name,
+                        line=line, ch=kwargs['ch'],
+                    )
+                # If True, merges drug name variants under canonical name
+                if canonical is not None:
+                    # Sets canonical drug name
+                    drug_name = canonical(drug_name)
+                # Sets tuple of prescriber full name
+                prescriber_name = (last_name, first_name)
+                # If drug does not exist in dictionary, adds new drug name
+                if drug_name not in all_data:
+                    # For each new drug, creates initial prescriber dictionary
+                    all_data[drug_name] = {}
+                    # If True, adds new drug to estimated memory size
+                    if budget is not None:
+                        # Adds size of drug name and sub-dictionary
+                        data_size += sys.getsizeof(drug_name) + drug_entry_size
+                # If prescriber is not assigned to drug, adds known prescriber
+                if prescriber_name not in all_data[drug_name]:
+                    # For each new prescriber, creates initial cost list
+                    all_data[drug_name][prescriber_name] = []
+                    # If True, adds new prescriber to estimated memory size
+                    if budget is not None:
+                        # Adds size of prescriber names, tuple, and cost list
+                        data_size += (
+                            sys.getsizeof(last_name) + sys.getsizeof(first_name)
+                            + prescriber_entry_size
+                        )
+                # Adds cost to drug's known prescribers
+                all_data[drug_name][prescriber_name].append(drug_cost)
+                # If True, records entry for next checkpoint
+                if delta is not None:
+                    # Adds drug, prescriber, and cost of entry
+                    delta.append((drug_name, prescriber_name, drug_cost))
+                # If True, checks estimated memory size against memory budget
+                if budget is not None:
+                    # Adds size of drug cost
+                    data_size += cost_entry_size
+                    next_check -= 1
+                    # If True, checks resident memory against memory limit
+                    if not next_check and memory_limit is not None:
+                        # Sets number of entries until next check
+                        next_check = memory_check_interval
+                        # Sets current resident memory
+                        rss = get_rss()
+                        # If True, resident memory grew beyond memory limit,
+                        # so estimated size is too small
+                        if rss is not None and rss > max(memory_limit, rss_mark):
+                            # Lowers memory budget to estimated size, but not
+                            # below minimum run size
+                            budget = max(
+                                int(data_size * budget_fraction), budget_floor
+                            )
+                    # If True, import data exceeds memory budget
+                    if data_size > budget:
+                        # Writes import data to sorted run file on disk
+                        spill_runs.append(
+                            spill_data(all_data, spill_dir, sync)
+                        )
+                        # Empties import data and resets estimated memory size
+                        all_data.clear()
+                        data_size = 0
+                        # Releases run files of checkpoints, whose entries
+                        # are now in spilled run file
+                        state_runs = []
+                        # If True, sets resident memory kept by allocator for
+                        # reuse, which is not counted as growth
+                        if memory_limit is not None:
+                            # Sets resident memory after spill
+                            rss_mark = get_rss() or 0
+            # If True, collects import data of sampled block separately
+            if sample is not None:
+                # Adds import data of sampled block
+                sample_data.append(all_data)
+                # Sets empty dictionary for import data of next block
+                all_data = {}
+            # If True, checkpoint is due after completed block
+            if next_checkpoint is not None and time.monotonic() >= next_checkpoint:
+                # If True, writes entries imported since last checkpoint to
+                # run file of checkpoint, and keeps import data in memory
+                if delta:
+                    # Writes entries to run file of checkpoint
+                    state_runs.append(adk.save_run(state_dir, delta))
+                    # Empties entries since last checkpoint
+                    delta.clear()
+                # If True, writes import data held since last checkpoint or
+                # spill to run file, so that each entry is written once
+                if budget is not None and all_data:
+                    # Writes import data to sorted run file on disk
+                    spill_runs.append(spill_data(all_data, spill_dir, sync))
+                    # Empties import data and resets estimated memory size
+                    all_data.clear()
+                    data_size = 0
+                    # Releases run files of checkpoints, whose entries are now
+                    # in spilled run file
+                    state_runs = []
+                # If True, writes digests added since last checkpoint to run
+                # file of checkpoint
+                if isinstance(dedup, ExactFilter) and dedup.added:
+                    # Writes digests to run file of checkpoint
+                    dedup_runs.append(adk.save_run(state_dir, dedup.added))
+                    # Empties digests since last checkpoint
+                    dedup.added = []
+                # Writes import state, byte offset, and paths to run files to
+                # checkpoint
+                adk.save_checkpoint(state_dir, key, {
+                    "offset": offset,
+                    "spill_runs": spill_runs,
+                    "state_runs": state_runs,
+                    "dedup_runs": dedup_runs,
+                    "dedup": dedup,
+                    "summary": summary,
+                    "canonical": canonical and canonical.spellings,
+                })
+                # Sets time of next checkpoint
+                next_checkpoint = time.monotonic() + interval
+        # If True, import data was spilled to disk during import
+        if spill_runs and all_data:
+            # Writes remaining import data to final sorted run file on disk
+            spill_runs.append(spill_data(all_data, spill_dir, sync))
+            # Empties import data, which is collected by merge_runs()
+            all_data.clear()
     # Returns all data as nested dictionary with prescriber name (1* key),
     # drug name (2* key), and drug cost (2* value) to script
     return all_data
 
+def set_memory_budget(options):
+    """
+    Interprets memory budget in megabytes from terminal flags. Memory
+    reserved for reading blocks and merging run files is subtracted to set
+    limit of resident memory. Memory already used by the interpreter is then
+    subtracted, and a safety margin is reserved for error of memory size
+    estimation. Remaining memory is returned as budget for import data.
+
+    Args:
+        options (dictionary): contains flag values with flag name as key.
+
+    Returns:
+        budget (integer or None): memory budget for import data in bytes. If
+            None, no memory budget is specified.
+        memory_limit (integer or None): limit of resident memory during
+            import in bytes. If None, no memory budget is specified.
+        spill_dir (string): path to directory for run files.
+
+    Raises:
+        ValueError: memory budget is not a number or is too small.
+        FileNotFoundError: spill directory does not exist.
+    """
+    # Sets spill directory, by default the system temporary directory
+    spill_dir = options.get("spill_dir")
+    spill_dir = spill_dir if isinstance(spill_dir, str) else tempfile.gettempdir()
+    # If spill directory cannot be found, raises file error
+    if not os.path.isdir(spill_dir):
+        # Raises error for non-existent spill directory
+        raise FileNotFoundError(
+            "Spill directory \"{}\" not found.\nPlease confirm and run "
+            "again.".format(spill_dir)
+        )
+    # If memory budget is not specified, import data is not limited
+    if "memory_budget" not in options:
+        # Returns empty memory budget and limit
+        return None, None, spill_dir
+    # If memory budget is not a number, raises value error
+    try:
+        # Sets limit of resident memory in bytes, excluding reserved memory
+        memory_limit = int(float(options["memory_budget"]) * 1024 ** 2)
+        memory_limit -= memory_reserve
+    except (TypeError, ValueError):
+        # Raises error for non-numeric memory budget
+        raise ValueError(
+            "Option \"--memory-budget\" requires numeric value in megabytes."
+            "\nCheck then run again."
+        )
+    # Sets current resident memory, or peak resident memory reported in
+    # kilobytes if current memory is not available
+    rss = get_rss()
+    if rss is None and resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    # Subtracts memory already used by interpreter, then reserves safety
+    # margin for memory size estimation
+    budget = int((memory_limit - (rss or 0)) * budget_fraction)
+    # If no memory remains for import data, raises value error
+    if budget <= 0:
+        # Raises error for memory budget below interpreter memory use
+        raise ValueError(
+            "Option \"--memory-budget\" is smaller than {:.0f} megabytes "
+            "used by interpreter and reserved for reading.\nIncrease budget "
+            "then run again.".format(((rss or 0) + memory_reserve) / 1024 ** 2)
+        )
+    # Returns memory budget for import data, limit of resident memory, and
+    # spill directory
+    return budget, memory_limit, spill_dir
+
+def get_rss():
+    """
+    Returns current resident memory of script. Resident memory is read from
+    "/proc/self/statm", which is only available on Linux.
+
+    Returns:
+        (integer or None): resident memory in bytes. If None, resident memory
+            is not available.
+    """
+    # If True, resident memory is not available
+    try:
+        # Safely opens and closes memory status for reading
+        with open("/proc/self/statm", 'rb') as statm_file:
+            # Sets number of resident memory pages
+            pages = int(statm_file.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        # Returns missing resident memory
+        return None
+    # Returns resident memory in bytes
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+def spill_data(all_data, spill_dir, sync=False):
+    """
+    Writes import data to sorted run file on disk. Each line of run file
+    contains drug name, prescriber last name, first name, and drug costs as
+    JSON array. Lines are sorted by drug name then prescriber name, so that
+    run files can be merged using the merge_runs() function.
+
+    Args:
+        all_data (nested dictionary): contains organized import data.
+        spill_dir (string): path to directory for run files.
+        sync (boolean): if True, run file is flushed to disk.
+
+    Returns:
+        run_path (string): path to run file.
+    """
+    # Creates new run file in spill directory
+    run_handle, run_path = tempfile.mkstemp(
+        prefix="pharmacopedia_run_", suffix=".txt", dir=spill_dir,
+    )
+    # Safely opens and closes run file for writing
+    with open(run_handle, 'w', encoding="utf-8") as run_file:
+        # Iterates over all drug names in sorted order
+        for drug_name in sorted(all_data):
+            # Iterates over all prescribers in sorted order
+            for prescriber_name in sorted(all_data[drug_name]):
+                # Sets run record of drug, prescriber, and drug costs
+                record = [drug_name, prescriber_name[0], prescriber_name[1],
+                    all_data[drug_name][prescriber_name]]
+                # Writes run record as single line
+                run_file.write(json.dumps(record) + "\n")
+        # If True, flushes run file to disk
+        if sync:
+            run_file.flush()
+            os.fsync(run_file.fileno())
+    # Returns path to run file
+    return run_path
+
+def set_dedup(options, import_path):
+    """
+    Creates duplicate entry filter from terminal flags. In "exact" mode, all
+    imported entries are kept in a set. In "bloom" mode, entries are kept in
+    a Bloom filter of fixed size, which is sized from expected number of
+    entries and false-positive rate. By default, expected number of entries
+    is estimated from input file size.
+
+    Args:
+        options (dictionary): contains flag values with flag name as key.
+        import_path (string): path to input file.
+
+    Returns:
+        dedup (ExactFilter, BloomFilter, or None): duplicate entry filter. If
+            None, duplicate entries are not dropped.
+
+    Raises:
+        ValueError: filter mode, false-positive rate, or expected number of
+            entries is invalid.
+    """
+    # Sets filter mode
+    mode = options.get("dedup")
+    # If flag is not specified, duplicate entries are not dropped
+    if mode is None:
+        # Returns empty filter
+        return None
+    # If flag has no value, uses Bloom filter
+    mode = "bloom" if mode is True else mode.lower()
+    # If True, keeps all imported entries
+    if mode == "exact":
+        # Returns exact filter
+        return ExactFilter()
+    # If filter mode is unknown, raises value error
+    if mode != "bloom":
+        # Raises error for unknown filter mode
+        raise ValueError(
+            "Option \"--dedup\" requires \"bloom\" or \"exact\" value.\n"
+            "Check then run again."
+        )
+    # If filter settings are not numbers, raises value error
+    try:
+        # Sets false-positive rate
+        fpr = float(options.get("dedup_fpr", dedup_fpr))
+        # Sets input size; size of standard input is unknown
+        input_size = (
+            dedup_stream_size if import_path == adc.stream_path
+            else os.path.getsize(import_path)
+        )
+        # Sets expected number of entries, estimated from input size
+        capacity = int(options.get(
+            "dedup_capacity", input_size // dedup_line_size + 1,
+        ))
+        # If True, settings are out of range
+        if not 0 < fpr < 1 or capacity < 1:
+            # Raises error for settings out of range
+            raise ValueError
+    except (TypeError, ValueError):
+        # Raises error for invalid filter settings
+        raise ValueError(
+            "Option \"--dedup-fpr\" requires value between 0 and 1, and "
+            "option \"--dedup-capacity\" requires positive integer.\nCheck "
+            "then run again."
+        )
+    # Returns Bloom filter
+    return BloomFilter(capacity, fpr)
+
+def set_canonical(options):
+    """
+    Creates drug name canonicalizer from terminal flags. Display policy is
+    given as flag value: "first" shows first spelling found in input file,
+    "common" shows most frequent spelling, and "key" shows canonical drug
+    name itself.
+
+    Args:
+        options (dictionary): contains flag values with flag name as key.
+
+    Returns:
+        canonical (DrugCanonicalizer or None): drug name canonicalizer. If
+            None, drug names are not canonicalized.
+
+    Raises:
+        ValueError: display policy is unknown.
+    """
+    # Sets display policy
+    policy = options.get("canonical")
+    # If flag is not specified, drug names are not canonicalized
+    if policy is None:
+        # Returns empty canonicalizer
+        return None
+    # If flag has no value, shows first spelling
+    policy = "first" if policy is True else policy.lower()
+    # If display policy is unknown, raises value error
+    if policy not in canonical_policies:
+        # Raises error for unknown display policy
+        raise ValueError(
+            "Option \"--canonical\" requires \"first\", \"common\", or "
+            "\"key\" value.\nCheck then run again."
+        )
+    # Returns canonicalizer
+    return DrugCanonicalizer(policy, canonical_memo_size)
+
+def set_checkpoint(options):
+    """
+    Interprets checkpoint directory, interval, and resume flag from terminal
+    flags.
+
+    Args:
+        options (dictionary): contains flag values with flag name as key.
+
+    Returns:
+        state_dir (string or None): path to checkpoint directory. If None,
+            checkpoints are not saved.
+        interval (float): minimum time between checkpoints in seconds.
+        resume (boolean): if True, import continues from latest checkpoint.
+
+    Raises:
+        ValueError: checkpoint interval is not a positive number, or resume
+            flag is specified without checkpoint directory.
+    """
+    # Sets checkpoint directory
+    state_dir = options.get("state_dir")
+    state_dir = state_dir if isinstance(state_dir, str) else None
+    # Sets resume flag
+    resume = bool(options.get("resume"))
+    # If resume flag has no checkpoint directory, raises value error
+    if resume and state_dir is None:
+        # Raises error for missing checkpoint directory
+        raise ValueError(
+            "Option \"--resume\" requires \"--state-dir\" option.\nCheck then "
+            "run again."
+        )
+    # If checkpoint interval is not a positive number, raises value error
+    try:
+        # Sets checkpoint interval in seconds
+        interval = float(options.get("checkpoint_interval", checkpoint_interval))
+        # If True, checkpoint interval is not positive
+        if interval <= 0:
+            # Raises error for non-positive interval
+            raise ValueError
+    except (TypeError, ValueError):
+        # Raises error for non-numeric checkpoint interval
+        raise ValueError(
+            "Option \"--checkpoint-interval\" requires positive value in "
+            "seconds.\nCheck then run again."
+        )
+    # Returns checkpoint directory, interval, and resume flag to script
+    return state_dir, interval, resume
+
+def set_sample(options):
+    """
+    Interprets sampling fraction and seed of sampling preview from terminal
+    flags. If no seed is specified, random seed is chosen, which is shown to
+    the user so that preview can be repeated.
+
+    Args:
+        options (dictionary): contains flag values with flag name as key.
+
+    Returns:
+        sample (float or None): fraction of input file read in sampling
+            preview. If None, whole file is imported.
+        seed (integer or None): seed of random choice of sampled blocks.
+
+    Raises:
+        ValueError: sampling fraction is not a number between 0 and 1, seed
+            is not an integer, or sampling is combined with checkpoints or
+            run comparison.
+    """
+    # If sampling preview is not requested, whole file is imported
+    if "sample" not in options:
+        # Returns empty sampling fraction and seed
+        return None, None
+    # If sampling fraction is not a number between 0 and 1, raises value error
+    try:
+        # Sets sampling fraction
+        sample = float(options["sample"])
+        # If True, sampling fraction is outside of range
+        if not 0 < sample <= 1:
+            # Raises error for sampling fraction outside of range
+            raise ValueError
+    except (TypeError, ValueError):
+        # Raises error for invalid sampling fraction
+        raise ValueError(
+            "Option \"--sample\" requires fraction between 0 and 1 (e.g., "
+            "\"--sample=0.05\").\nCheck then run again."
+        )
+    # If seed is not an integer, raises value error
+    try:
+        # Sets specified seed, or chooses random seed
+        seed = int(options.get("seed", random.randrange(2 ** 32)))
+    except (TypeError, ValueError):
+        # Raises error for non-integer seed
+        raise ValueError(
+            "Option \"--seed\" requires integer value.\nCheck then run again."
+        )
+    # Iterates over flags which are not compatible with sampling preview
+    for name in ["state_dir", "resume", "diff"]:
+        # If True, incompatible flag is specified
+        if name in options:
+            # Raises error for incompatible flag
+            raise ValueError(
+                "Option \"--sample\" cannot be combined with \"--{}\" "
+                "option.\nCheck then run again.".format(name.replace("_", "-"))
+            )
+    # Returns sampling fraction and seed to script
+    return sample, seed
+
+def open_import(import_path):
+    """
+    Opens input file in binary mode. Path "-" stands for standard input,
+    which is not closed after import. Required by import_data() function.
+
+    Args:
+        import_path (string): path to input file.
+
+    Returns:
+        (context manager): input file opened in binary mode.
+    """
+    # If True, reads standard input
+    if import_path == adc.stream_path:
+        # Returns binary standard input
+        return read_stdin()
+    # Returns input file
+    return open(import_path, 'rb')
+
+@contextlib.contextmanager
+def read_stdin():
+    """
+    Provides binary standard input for reading, without closing it after
+    reading. Required by open_import() function.
+
+    Yields:
+        (file): binary standard input.
+    """
+    # Provides binary standard input
+    yield sys.stdin.buffer
+
+@contextlib.contextmanager
+def remove_runs_on_error(spill_runs, remove):
+    """
+    Removes run files if import fails, so that no run files are left on
+    disk. Run files are kept if recorded in checkpoints. Required by
+    import_data() function.
+
+    Args:
+        spill_runs (list of strings or None): contains paths to run files.
+        remove (boolean): if True, run files are removed after error.
+
+    Yields:
+        None.
+    """
+    # If True, import fails
+    try:
+        # Runs import
+        yield
+    except BaseException:
+        # If True, removes run files
+        if remove:
+            # Iterates over all run files
+            for path in spill_runs or []:
+                # If True, run file exists
+                if os.path.isfile(path):
+                    # Removes single run file
+                    os.remove(path)
+        # Raises original error
+        raise
+
+def read_first_line(target_file):
+    """
+    Reads first data entry of file opened in binary mode, skipping empty
+    lines. Byte offsets are counted from the start of reading, rather than
+    retrieved from file, so that standard input can be read. Required by
+    import_data() function.
+
+    Args:
+        target_file (file): input file opened in binary mode.
+
+    Returns:
+        first_lines (list of strings or None): first data entry, followed
+            by any further lines read with it. If None, file has no data
+            entries.
+        line_start (integer): byte offset of first data entry.
+        line_end (integer): byte offset after lines read.
+    """
+    # Sets byte offset of first line
+    line_end = 0
+    # Iterates over lines until data entry is found
+    while True:
+        # Sets byte offset of line
+        line_start = line_end
+        # Reads single line
+        raw_line = target_file.readline()
+        # Sets byte offset after line
+        line_end += len(raw_line)
+        # If True, end of file is reached
+        if not raw_line:
+            # Returns empty first data entry
+            return None, line_start, line_end
+        # Decodes single line, which has several lines if line breaks are
+        # carriage returns
+        first_lines = decode_block(raw_line)
+        # If True, line is data entry
+        if first_lines[0].count(',') >= 1:
+            # Returns first data entry and its byte offsets
+            return first_lines, line_start, line_end
+
+def read_blocks(target_file, offset=0, size=None):
+    """
+    Reads file opened in binary mode in newline-aligned blocks. Reading in
+    blocks, rather than single lines, reduces decoding overhead and gives the
+    byte offset after each block, which is required for checkpoints.
+
+    Args:
+        target_file (file): input file opened in binary mode.
+        offset (integer): byte offset of start of reading.
+        size (integer or None): block size in bytes. If None, "block_size"
+            setting is used.
+
+    Yields:
+        offset (integer): byte offset after block.
+        all_lines (list of strings): data entries without line breaks.
+    """
+    # Sets block size
+    size = block_size if size is None else size
+    # Sets incomplete last line of previous block
+    remainder = b""
+    # Iterates over all blocks
+    while True:
+        # Reads single block
+        block = target_file.read(size)
+        # If True, end of file is reached
+        if not block:
+            # Ends iteration over blocks
+            break
+        # Joins incomplete line of previous block
+        block = remainder + block
+        # Sets position after last line break in block
+        cut = block.rfind(b"\n") + 1
+        # Saves incomplete last line for next block
+        remainder = block[cut:]
+        # If True, block has no line break
+        if not cut:
+            # Continues reading until line break is found
+            continue
+        # Sets byte offset after last complete line
+        offset += cut
+        # Returns complete lines of block
+        yield offset, decode_block(block[:cut])
+    # If True, last line has no line break
+    if remainder:
+        # Sets byte offset at end of file
+        offset += len(remainder)
+        # Returns last line
+        yield offset, decode_block(remainder)
+
+def read_sample(target_file, data_start, sample, seed, summary):
+    """
+    Reads random newline-aligned blocks of file opened in binary mode. Data
+    section of file is divided into blocks of equal size in bytes, and each
+    data entry belongs to block which contains its first byte, so that every
+    data entry has the same chance to be read. Total and sampled number of
+    blocks are added to run summary. Required by import_data() function.
+
+    Args:
+        target_file (file): input file opened in binary mode.
+        data_start (integer): byte offset of first data entry after header.
+        sample (float): fraction of blocks which are read.
+        seed (integer): seed of random choice of sampled blocks.
+        summary (dictionary): collects total number of blocks (integer, key
+            "sample_blocks") and number of sampled blocks (integer, key
+            "sampled_blocks").
+
+    Yields:
+        offset (integer): byte offset after block.
+        all_lines (list of strings): data entries without line breaks.
+    """
+    # Sets byte offset at end of file
+    data_end = target_file.seek(0, os.SEEK_END)
+    # Sets total number of blocks in data section
+    num_blocks = max(1, -(-(data_end - data_start) // sample_block_size))
+    # Sets number of sampled blocks
+    num_sampled = min(
+        num_blocks, max(sample_min_blocks, math.ceil(sample * num_blocks))
+    )
+    # Adds total and sampled number of blocks to run summary
+    summary["sample_blocks"] = num_blocks
+    summary["sampled_blocks"] = num_sampled
+    # Iterates over randomly chosen blocks in file order
+    for index in sorted(random.Random(seed).sample(range(num_blocks), num_sampled)):
+        # Sets byte offsets of start and end of block
+        start = data_start + index * sample_block_size
+        end = min(start + sample_block_size, data_end)
+        # If True, block starts after first data entry
+        if start > data_start:
+            # Moves to last byte of previous block and skips remainder of
+            # line, which belongs to previous block
+            target_file.seek(start - 1)
+            target_file.readline()
+        # Else, moves to start of first data entry
+        else:
+            target_file.seek(start)
+        # If True, first line of block starts in later block
+        if target_file.tell() >= end:
+            # Returns empty block
+            yield end, []
+            # Continues with next block
+            continue
+        # Reads remainder of block
+        block = target_file.read(end - target_file.tell())
+        # If True, last line of block continues in next block
+        if not block.endswith(b"\n"):
+            # Completes last line of block
+            block += target_file.readline()
+        # Returns complete lines of block
+        yield target_file.tell(), decode_block(block)
+
+def decode_block(block):
+    """
+    Decodes block of raw data and splits it into lines. As in text mode, all
+    carriage return line breaks are treated as new line characters.
+
+    Args:
+        block (bytes): raw data of complete lines.
+
+    Returns:
+        all_lines (list of strings): lines without line breaks.
+    """
+    # Decodes raw data
+    text = block.decode(import_encoding)
+    # If True, replaces carriage return line breaks
+    if "\r" in text:
+        # Sets uniform line breaks
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    # Returns lines without line breaks
+    return text.split("\n")
+
+def get_schema(first_line):
+    """
+    Determines column layout from first data entry. If first data entry
+    contains "drug_name" column name (or known alias), it is identified as
+    file header and columns are mapped by name. Else, default layout of
+    prescriber ID, last name, first name, drug name, and drug cost is used.
+    Columns before drug name are indexed from start of entry; drug name and
+    following columns are indexed from end of entry, so that over-delimited
+    name elements do not shift drug name and cost.
+
+    Args:
+        first_line (string): first data entry of imported file.
+
+    Returns:
+        schema (dictionary): contains column names (list of strings, key
+            "columns"), column indices (dictionary, key "positions"), and
+            whether first data entry is file header (boolean, key "header").
+
+    Raises:
+        KeyError: file header does not contain required column.
+    """
+    # Sets column names from first data entry
+    names = [
+        name.strip().strip("\"").lower()
+        for name in parse_line_custom(first_line)
+    ]
+    # Replaces known column aliases with standard column names
+    names = [column_aliases.get(name, name) for name in names]
+    # Sets whether first data entry is file header
+    header = "drug_name" in names
+    # If not file header, uses default column layout
+    if not header:
+        # Sets default column names
+        names = list(default_columns)
+    # Iterates over all columns required for analysis
+    for column in import_columns:
+        # If required column is missing, raises key error
+        if column not in names:
+            # Raises error for missing column
+            raise KeyError(
+                "File header does not contain \"{}\" column.\nCheck then run "
+                "again.".format(column)
+            )
+    # Sets index of drug name column
+    pivot = names.index("drug_name")
+    # Sets index of each column from start or end of entry
+    positions = {
+        name: (i if i < pivot else i - len(names))
+        for i, name in reversed(list(enumerate(names)))
+    }
+    # Returns column layout
+    return {"columns": names, "positions": positions, "header": header}
+
+def set_decoder(schema, columns):
+    """
+    Creates specialized decoder which extracts specified columns from data
+    entry. Entries without double-quotation marks are split only as far as
+    required by the specified columns. Entries with double-quotation marks
+    are parsed using the parse_line_custom() function.
+
+    Args:
+        schema (dictionary): column layout from get_schema() function.
+        columns (list of strings): contains names of columns to extract.
+
+    Returns:
+        decode_line (function): returns column value (string) if one column
+            is specified, or tuple of column values (strings) in specified
+            order, from data entry (string).
+    """
+    # Sets indices of specified columns
+    positions = [schema["positions"][column] for column in columns]
+    # Sets function which collects specified columns from split entry
+    get_columns = operator.itemgetter(*positions)
+    # If True, all columns are indexed from start of entry
+    if all(i >= 0 for i in positions):
+        # Sets number of splits from start of entry
+        num_splits = max(positions) + 1
+        # Sets split from start of entry
+        split_line = lambda line: line.split(",", num_splits)
+    # If True, all columns are indexed from end of entry
+    elif all(i < 0 for i in positions):
+        # Sets number of splits from end of entry
+        num_splits = - min(positions)
+        # Sets split from end of entry
+        split_line = lambda line: line.rsplit(",", num_splits)
+    # Else, columns are indexed from both start and end of entry
+    else:
+        # Sets full split
+        split_line = lambda line: line.split(",")
+
+    def decode_line(line):
+        """
+        Extracts specified columns from data entry. Required by
+        import_data() function.
+
+        Args:
+            line (string): single string of raw data without line break.
+
+        Returns:
+            (string or tuple of strings): specified column values.
+        """
+        # If True, entry elements may contain non-delimiting commas
+        if "\"" in line:
+            # Parses line intelligently to account for non-active commas
+            return get_columns(parse_line_custom(line))
+        # Splits line and collects specified columns
+        return get_columns(split_line(line))
+
+    # Returns specialized decoder
+    return decode_line
+
 def parse_line_custom(line):
     """
     Separates and splits data entry line based on comma delimiters and the
@@ -266,6 +1542,227 @@ def parse_line_custom(line):
     return parsed_line
 
 
+## CLASSES
+
+class ExactFilter:
+    """
+    Identifies repeated data entries by keeping 128-bit BLAKE2 digests of all
+    imported entries in a set. Memory use is proportional to number of
+    entries, but not to their length. Digests added since last checkpoint can
+    be collected, so that checkpoints only write new digests; pickled filter
+    does not contain digests. Used by import_data().
+    """
+
+    def __init__(self):
+        # Sets empty set of digests of imported entries
+        self.seen = set()
+        # Sets digests added since last checkpoint; None if not collected
+        self.added = None
+
+    def __getstate__(self):
+        # Returns state without digests, which are saved to run files of
+        # checkpoints
+        return {"seen": set(), "added": None}
+
+    def check(self, line):
+        """
+        Returns True if data entry was already checked; else, records entry.
+
+        Args:
+            line (string): single string of raw data without line break.
+
+        Returns:
+            (boolean): if True, data entry is a duplicate.
+        """
+        # Sets 128-bit digest of data entry
+        digest = hashlib.blake2b(line.encode(), digest_size=16).digest()
+        # If True, data entry was already checked
+        if digest in self.seen:
+            # Identifies duplicate entry
+            return True
+        # Records new data entry
+        self.seen.add(digest)
+        # If True, collects digest for next checkpoint
+        if self.added is not None:
+            self.added.append(digest)
+        # Identifies new entry
+        return False
+
+class BloomFilter:
+    """
+    Identifies repeated data entries using Bloom filter of fixed size. Number
+    of bits and hash functions are set from expected number of entries and
+    false-positive rate. New entries are identified as duplicates with at
+    most the given false-positive rate; duplicates are always identified.
+    Bit positions are derived from single BLAKE2 digest by double hashing.
+    Used by import_data().
+    """
+
+    def __init__(self, capacity, fpr):
+        # Sets optimal number of bits for capacity and false-positive rate
+        self.num_bits = max(8, int(-capacity * math.log(fpr) / math.log(2) ** 2))
+        # Sets optimal number of hash functions
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        # Sets all bits to zero
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def check(self, line):
+        """
+        Returns True if data entry was probably already checked; else,
+        records entry.
+
+        Args:
+            line (string): single string of raw data without line break.
+
+        Returns:
+            (boolean): if True, data entry is probably a duplicate.
+        """
+        # Sets 128-bit digest of data entry
+        digest = hashlib.blake2b(line.encode(), digest_size=16).digest()
+        # Sets two independent hashes; second hash is odd
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        # Sets whether all bits were already set
+        seen = True
+        # Iterates over all hash functions
+        for i in range(self.num_hashes):
+            # Sets bit position
+            position = (h1 + i * h2) % self.num_bits
+            # Sets byte index and bit mask
+            index, mask = position >> 3, 1 << (position & 7)
+            # If True, bit was not set and entry is new
+            if not self.bits[index] & mask:
+                # Sets bit
+                self.bits[index] |= mask
+                seen = False
+        # Identifies duplicate or new entry
+        return seen
+
+class DrugCanonicalizer:
+    """
+    Merges variants of drug names which differ only in case, whitespace, or
+    punctuation. Canonical drug name is uppercase, with punctuation replaced
+    by spaces and whitespace collapsed. Canonical names are kept in bounded
+    memo, so that each distinct spelling is normalized only once; oldest
+    spellings are removed when memo is full. Spellings are recorded for each
+    canonical name to set displayed drug name, as required by display
+    policy: first spelling for "first" policy, occurrences of all spellings
+    for "common" policy, and none for "key" policy. Used by import_data()
+    and drug name filter.
+    """
+
+    def __init__(self, policy, memo_size):
+        # Sets display policy and maximum memo size
+        self.policy = policy
+        self.memo_size = memo_size
+        # Sets empty memo of canonical names with raw drug name as key
+        self.memo = {}
+        # Sets empty record of spellings with canonical name as key, and
+        # first spelling or occurrences with raw drug name as key as value
+        self.spellings = {}
+
+    def __call__(self, drug_name):
+        """
+        Returns canonical drug name, and records spelling.
+
+        Args:
+            drug_name (string): drug name as parsed from data entry.
+
+        Returns:
+            key (string): canonical drug name.
+        """
+        # Sets canonical name
+        key = self.get_key(drug_name)
+        # If True, records first spelling of canonical name
+        if self.policy == "first":
+            # Adds spelling if canonical name is new
+            if key not in self.spellings:
+                self.spellings[key] = drug_name
+        # If True, counts occurrences of spelling
+        elif self.policy == "common":
+            # Adds occurrence of spelling
+            occurrences = self.spellings.setdefault(key, {})
+            occurrences[drug_name] = occurrences.get(drug_name, 0) + 1
+        # Returns canonical name
+        return key
+
+    def get_key(self, drug_name):
+        """
+        Returns canonical drug name from memo, without recording spelling.
+
+        Args:
+            drug_name (string): drug name as parsed from data entry.
+
+        Returns:
+            key (string): canonical drug name.
+        """
+        # Sets canonical name from memo
+        key = self.memo.get(drug_name)
+        # If True, spelling is not in memo
+        if key is None:
+            # Sets canonical name
+            key = self.normalize(drug_name)
+            # If True, memo is full
+            if len(self.memo) >= self.memo_size:
+                # Removes oldest spelling from memo
+                del self.memo[next(iter(self.memo))]
+            # Adds spelling to memo
+            self.memo[drug_name] = key
+        # Returns canonical name
+        return key
+
+    def normalize(self, drug_name):
+        """
+        Returns canonical drug name: uppercase letters and digits, with
+        other characters replaced by spaces and whitespace collapsed.
+
+        Args:
+            drug_name (string): drug name as parsed from data entry.
+
+        Returns:
+            (string): canonical drug name.
+        """
+        # Replaces punctuation by spaces
+        chars = "".join(c if c.isalnum() else " " for c in drug_name.upper())
+        # Returns name with collapsed whitespace, or stripped drug name if
+        # name has no letters or digits
+        return " ".join(chars.split()) or drug_name.strip()
+
+    def display(self, processed_data):
+        """
+        Replaces canonical drug names in analyzed data by displayed names
+        according to display policy. Displayed spellings are stripped of
+        enclosing whitespace.
+
+        Args:
+            processed_data (dictionary): contains analyzed data or statistics
+                with canonical drug name as key.
+
+        Returns:
+            (dictionary): contains analyzed data or statistics with displayed
+                drug name as key.
+        """
+        # Sets empty dictionary of displayed names
+        all_names = {}
+        # Iterates over all canonical names
+        for key in processed_data:
+            # Sets recorded spellings of canonical name
+            spellings = self.spellings.get(key)
+            # If True, shows canonical name
+            if self.policy == "key" or not spellings:
+                all_names[key] = key
+            # If True, shows most frequent spelling; ties show first spelling
+            elif self.policy == "common":
+                all_names[key] = max(spellings, key=spellings.get).strip()
+            # Else, shows first spelling
+            else:
+                all_names[key] = spellings.strip()
+        # Returns analyzed data with displayed names
+        return {
+            all_names[key]: values for key, values in processed_data.items()
+        }
+
+
 ## MODULE METADATA
 
 __author__ = 'Arthur D. Dysart'
@@ -60,6 +60,15 @@ import DysartAnalysis as ad2
 # Retrives functions for data export
 # Source: (home)/src/DysartExport.py
 import DysartExport as ad3
+# Retrives functions for import checkpoints
+# Source: (home)/src/DysartCheckpoint.py
+import DysartCheckpoint as adk
+# Retrives functions for result caching
+# Source: (home)/src/DysartCache.py
+import DysartCache as adx
+# Retrives functions for path and stream checks
+# Source: (home)/src/DysartComm.py
+import DysartComm as adc
 
 
 ## SCRIPT SETTINGS
@@ -86,6 +95,152 @@ unsafe_char = [
     "0","1","2","3","4","5","6","7","8","9",
     " ",",","-",".","%","&","/","(",")","#","\"","\'","\\",
 ]
+# Sets optional terminal flags recognized by script, given as "--name=value".
+# See "Read Me" for description of each flag
+valid_options = [
+    "drugs", "prefix", "min_cost", "max_cost",
+    "memory_budget", "spill_dir",
+    "state_dir", "checkpoint_interval", "resume",
+    "dedup", "dedup_fpr", "dedup_capacity", "stats",
+    "diff", "snapshot", "cache_dir", "cache", "cache_size",
+    "sample", "seed", "canonical",
+]
+
+
+## PRIMARY FUNCTIONS
+
+def aggregate_data(import_path, options, summary):
+    """
+    Imports and analyzes data from input file according to optional flags.
+    Applies drug filters, memory budget, checkpoints, and duplicate entry
+    filter during import.
+
+    Args:
+        import_path (string): path to input file.
+        options (dictionary): contains flag values with flag name as key.
+        summary (dictionary): collects run summary.
+
+    Returns:
+        processed_data (dictionary): contains all analyzed data. Primary key
+            is drug name (string), and primary value is tuple containing
+            number of prescribers (integer, index 0) and total cost (float,
+            index 1).
+        drug_stats (dictionary or None): contains cost sketch with drug name
+            as key. If None, statistics are not requested.
+    """
+    # Sets drug name canonicalizer
+    canonical = ad1.set_canonical(options)
+    # Sets drug name filter from optional flags, comparing canonical names
+    drug_filter = ad1.set_drug_filter(options, canonical)
+    # Sets checkpoint directory, interval, and resume flag
+    state_dir, interval, resume = ad1.set_checkpoint(options)
+    # Identifies input file and import settings for checkpoints
+    key = adk.get_key(import_path, options) if state_dir is not None else None
+    # If True, restores import state from latest valid checkpoint
+    resume_state = adk.load_checkpoint(state_dir, key) if resume else None
+    # If True, no valid checkpoint is found and import starts from beginning
+    if resume and resume_state is None:
+        # Prints checkpoint status to terminal
+        print(
+            "No valid checkpoint found. Import starts from beginning.\n",
+            file=sys.stderr,
+        )
+    # If True, prints checkpoint byte offset to terminal
+    elif resume:
+        # Prints checkpoint status to terminal
+        print(
+            "Import resumes at byte {}.\n".format(resume_state["offset"]),
+            file=sys.stderr,
+        )
+    # Sets duplicate entry filter
+    dedup = ad1.set_dedup(options, import_path)
+    # Sets memory budget for import data, limit of resident memory, and spill
+    # directory for run files. Memory budget is set last, so that memory used
+    # by filters and restored checkpoint is subtracted
+    budget, memory_limit, spill_dir = ad1.set_memory_budget(options)
+    # Sets empty collection of run files written if memory budget is exceeded
+    spill_runs = []
+    # Organizes data in nested dictionary according to drug (1* key),
+    # prescriber (2* key), and cost (2* value). Also sets warnings
+    all_data = ad1.import_data(
+        import_path, warn=warning_display, ch=safe_char,
+        drug_filter=drug_filter,
+        budget=budget, memory_limit=memory_limit, spill_dir=spill_dir,
+        spill_runs=spill_runs,
+        state_dir=state_dir, interval=interval, key=key,
+        resume_state=resume_state, dedup=dedup, summary=summary,
+        canonical=canonical,
+    )
+    # If True, collects distribution statistics of prescriber costs
+    drug_stats = {} if options.get("stats") else None
+    # If True, merges run files written during import
+    if spill_runs:
+        # Calculates prescriber count and cost for each drug from run files
+        processed_data = ad2.merge_runs(spill_runs, drug_stats)
+    # Else, analyzes import data in memory
+    else:
+        # Calculates prescriber count (index 0) and cost (index 1) for each drug
+        processed_data = ad2.analyze_data(all_data, drug_stats)
+    # If True, replaces canonical drug names by displayed spellings
+    if canonical is not None:
+        # Sets displayed names of analyzed data and statistics
+        processed_data = canonical.display(processed_data)
+        drug_stats = (
+            None if drug_stats is None else canonical.display(drug_stats)
+        )
+    # If True, removes checkpoints of completed import
+    if state_dir is not None:
+        # Removes all checkpoints
+        adk.clear_checkpoints(state_dir)
+    # Returns analyzed data and statistics
+    return processed_data, drug_stats
+
+def get_snapshot(import_path, options, cache_dir):
+    """
+    Returns analyzed data of input file from cached snapshot. If snapshot is
+    missing, analyzes input file and caches snapshot. Input path may also be
+    snapshot file (.json), which is read directly.
+
+    Args:
+        import_path (string): path to input file or snapshot file.
+        options (dictionary): contains flag values with flag name as key.
+        cache_dir (string): path to cache directory.
+
+    Returns:
+        processed_data (dictionary): contains all analyzed data.
+
+    Raises:
+        ValueError: snapshot file is not valid.
+    """
+    # If True, reads analyzed data from snapshot file
+    if import_path.lower().endswith(".json"):
+        processed_data = adx.load_snapshot(import_path)
+        # If True, snapshot file is not valid
+        if processed_data is None:
+            # Raises error for invalid snapshot
+            raise ValueError(
+                "File \"{}\" is not a valid snapshot.\nCheck then run "
+                "again.".format(import_path)
+            )
+        # Returns analyzed data
+        return processed_data
+    # Identifies analyzed data by input fingerprint and flags
+    key = adx.get_snapshot_key(import_path, options, cache_dir)
+    # Reads cached snapshot
+    processed_data = adx.load_snapshot(adx.get_snapshot_path(cache_dir, key), key)
+    # If True, snapshot is missing
+    if processed_data is None:
+        # Prints snapshot status to terminal
+        print("Building snapshot:\t{}\n".format(import_path), file=sys.stderr)
+        # Analyzes input file; statistics are not kept in snapshots
+        processed_data = aggregate_data(import_path, options, {})[0]
+        # Caches snapshot
+        adx.save_snapshot(cache_dir, key, processed_data)
+    # Else, prints snapshot status to terminal
+    else:
+        print("Cached snapshot:\t{}\n".format(import_path), file=sys.stderr)
+    # Returns analyzed data
+    return processed_data
 
 
 ## MAIN MODULE
@@ -95,31 +250,165 @@ if __name__ == "__main__":
     # Displays script header in terminal
     print(
         "\nPharmacopedia v1.0\n"
-        "========================\n"
+        "========================\n",
+        file=sys.stderr,
     )
 
     ## IMPORT DATA
+    # Separates optional flags from positional arguments
+    terminal_args, options = ad1.get_options(sys.argv, valid_options)
     # Retrives and checks arguments from terminal
-    import_path, export_path, alpha_sort = ad1.get_args(sys.argv)
-    # Organizes data in nested dictionary according to drug (1* key),
-    # prescriber (2* key), and cost (2* value). Also sets warnings 
-    all_data = ad1.import_data(import_path, warn=warning_display, ch=safe_char)
+    import_path, export_path, alpha_sort = ad1.get_args(terminal_args)
+    # Checks flags which require input or output file
+    adc.check_streams(import_path, export_path, options)
+    # Sets total cost range from optional flags
+    min_cost, max_cost = ad1.set_cost_range(options)
+    # Sets empty run summary, which is completed during import
+    summary = {}
+
+    ## PREVIEW SAMPLE
+    # Sets sampling fraction and seed from optional flags
+    sample, seed = ad1.set_sample(options)
+    # If True, estimates results from random blocks of input file
+    if sample is not None:
+        # Sets empty collection of import data of sampled blocks
+        sample_data = []
+        # Sets drug name canonicalizer
+        canonical = ad1.set_canonical(options)
+        # Imports data of sampled blocks
+        ad1.import_data(
+            import_path, warn=warning_display, ch=safe_char,
+            drug_filter=ad1.set_drug_filter(options, canonical),
+            dedup=ad1.set_dedup(options, import_path), summary=summary,
+            sample=sample, seed=seed, sample_data=sample_data,
+            canonical=canonical,
+        )
+        # Estimates prescriber count and cost for each drug with margins
+        processed_data, margins = ad2.estimate_data(sample_data, summary)
+        # If True, replaces canonical drug names by displayed spellings
+        if canonical is not None:
+            # Sets displayed names of estimates and margins
+            processed_data = canonical.display(processed_data)
+            margins = canonical.display(margins)
+        # Removes drugs with estimated cost outside of cost range
+        processed_data = ad2.filter_costs(processed_data, min_cost, max_cost)
+        # Sorts drugs by decreasing estimated cost and alphanumeric order
+        all_drugs_sorted = ad2.sort_drugs(
+            processed_data, alpha_sort, ch=safe_char
+        )
+        # Writes estimates to new file at export path
+        ad3.export_estimate(
+            processed_data, margins, all_drugs_sorted, export_path,
+            cost_usd, summary,
+        )
+        # Displays script footer, sampling details, and export path
+        print(
+            "\nSampling preview complete. Results are estimates.\n",
+            file=sys.stderr,
+        )
+        print(
+            "Sampled blocks:\t{} of {}".format(
+                summary.get("sampled_blocks", 0),
+                summary.get("sample_blocks", 0),
+            ),
+            file=sys.stderr,
+        )
+        print("Sampling seed:\t{}\n".format(seed), file=sys.stderr)
+        print("Export file:\t{}\n".format(export_path), file=sys.stderr)
+        # Ends script
+        sys.exit(0)
+
+    ## COMPARE RUNS
+    # If True, compares input file with previous input file or snapshot
+    if "diff" in options:
+        # Sets cache directory for snapshots
+        cache_dir = adx.set_cache_dir(options)
+        # Sets analyzed data of current input file or snapshot
+        new_data = get_snapshot(import_path, options, cache_dir)
+        # Sets previous input file or snapshot
+        old_path = options["diff"]
+        # If previous input file or snapshot cannot be found, raises error
+        adc.check_paths(old_path, export_path)
+        # Sets analyzed data of previous input file or snapshot
+        old_data = get_snapshot(old_path, options, cache_dir)
+        # Sets drug name canonicalizer, which matches drugs of both runs by
+        # canonical name
+        canonical = ad1.set_canonical(options)
+        # Compares drugs of previous and current runs
+        diff_rows = ad2.diff_data(
+            old_data, new_data, alpha_sort, ch=safe_char,
+            key=None if canonical is None else canonical.normalize,
+        )
+        # Writes comparison to new file at export path
+        ad3.export_diff(diff_rows, export_path, cost_usd)
+        # Displays script footer and export path in terminal
+        print("\nRun comparison complete.\n", file=sys.stderr)
+        print("Export file:\t{}\n".format(export_path), file=sys.stderr)
+        # Ends script
+        sys.exit(0)
+
+    ## REUSE RESULT
+    # Sets result cache directory and size limit
+    result_dir, result_limit = adx.set_result_cache(options)
+    # If True, looks up exported result of identical earlier run. Snapshot
+    # requires analyzed data, so result is not reused with snapshot flag
+    if result_dir is not None and not options.get("snapshot"):
+        # Identifies exported result by input fingerprint, flags, and settings
+        result_key = adx.get_result_key(import_path, options, result_dir, {
+            "alpha_sort": alpha_sort,
+            "cost_usd": cost_usd,
+            "safe_char": safe_char,
+        })
+        # If True, copies cached result to export path
+        if adx.load_result(result_dir, result_key, export_path):
+            # Displays script footer and export path in terminal
+            print("\nCached result reused.\n", file=sys.stderr)
+            print("Export file:\t{}\n".format(export_path), file=sys.stderr)
+            # Ends script
+            sys.exit(0)
 
     ## ANALYZE DATA
-    # Calculates prescriber count (index 0) and cost (index 1) for each drug
-    processed_data = ad2.analyze_data(all_data)
+    # Imports data and calculates prescriber count (index 0) and cost
+    # (index 1) for each drug
+    processed_data, drug_stats = aggregate_data(import_path, options, summary)
+    # If True, caches snapshot of analyzed data for later comparison
+    if options.get("snapshot"):
+        # Sets cache directory for snapshots
+        cache_dir = adx.set_cache_dir(options)
+        # Caches snapshot
+        snapshot_path = adx.save_snapshot(
+            cache_dir, adx.get_snapshot_key(import_path, options, cache_dir),
+            processed_data,
+        )
+        # Displays snapshot path, which may be given to --diff flag
+        print("Snapshot file:\t{}\n".format(snapshot_path), file=sys.stderr)
+    # Removes drugs with total cost outside of cost range
+    processed_data = ad2.filter_costs(processed_data, min_cost, max_cost)
     # Sorts drugs by decreasing cost and alphanumeric order
     all_drugs_sorted = ad2.sort_drugs(processed_data, alpha_sort, ch=safe_char)
 
     ## EXPORT DATA
     # Writes ordered data to new file at export path
-    ad3.export_data(processed_data, all_drugs_sorted, export_path, cost_usd)
+    ad3.export_data(
+        processed_data, all_drugs_sorted, export_path, cost_usd, drug_stats
+    )
+    # If True, caches exported result for identical later runs
+    if result_dir is not None and not options.get("snapshot"):
+        # Copies exported result to cache directory
+        adx.save_result(result_dir, result_key, export_path, result_limit)
 
     ## END SCRIPT
     # Displays script footer in terminal
-    print("\nPharmacy counting complete.\n")
+    print("\nPharmacy counting complete.\n", file=sys.stderr)
     # Displays file export path
-    print("Export file:\t{}\n".format(export_path))
+    print("Export file:\t{}\n".format(export_path), file=sys.stderr)
+    # If True, displays number of dropped duplicate entries
+    if "duplicates" in summary:
+        # Displays duplicate entry count
+        print(
+            "Duplicates dropped:\t{}\n".format(summary["duplicates"]),
+            file=sys.stderr,
+        )
 
 
 ## MODULE METADATA